@@ -1,21 +1,49 @@
+import importlib.util
+import tempfile
 import time
-from sentiment import detect_sentiment, correct_negative_sentence
-from math import radians, sin, cos, sqrt, atan2
+from sentiment import correct_negative_sentence, LEXICON_VERSION
+from sentiment_cache import get_default_cache
+from write_queue import feedback_writer_stats, submit_feedback
+from dedup import find_near_duplicates, get_lsh_index, to_blob
+from rescore import start_background_rescore
+from timing import end_trace, span, start_trace
+from spatial import SchoolIndex
+from zonasi import coverage_points, schools_within, tier_for
+from map_render import (
+    MAP_HEIGHT,
+    MAP_WIDTH,
+    COVERAGE_MIN_ZOOM,
+    add_coverage_heatmap,
+    base_map,
+    bounds_from_map_data,
+    build_school_layer,
+    pad_bounds,
+    school_stats_arrays,
+    view_bounds,
+)
+import numpy as np
 import pandas as pd
-import nltk
 import streamlit as st
 from streamlit_js_eval import get_geolocation
 from db import (
+    DB,
+    cached,
     init_db,
     insert_sample_sekolah_if_empty,
     load_sekolah_df,
-    load_feedback_df,
-    save_feedback,
-    get_sekolah_id_by_nama
+    load_feedback_page,
+    export_feedback,
+    load_sekolah_stats_df,
+    load_sentiment_trend,
+    load_sekolah_registry,
+    refresh_zonasi_grid,
+    search_feedback
 )
 from streamlit_folium import st_folium
 import folium
-from folium.plugins import Fullscreen, MeasureControl
+
+# ---------- Timing per rerun (panel debug di sidebar, log JSONL lewat RADAR_ZONASI_TRACE_LOG) ----------
+start_trace("rerun", force=st.session_state.get("debug_timing", False))
 
 # ---------- Page config ----------
 st.set_page_config(page_title="Radar Zonasi Sentimen — Streamlit", layout="wide")
@@ -31,7 +59,8 @@ div.stButton>button:hover{background:#45a049}
 """, unsafe_allow_html=True)
 
 # ================== GPS OTOMATIS ==================
-geo = get_geolocation()
+with span("get_geolocation"):
+    geo = get_geolocation()
 if geo and "coords" in geo and "latitude" in geo["coords"] and "longitude" in geo["coords"]:
     user_lat = geo["coords"]["latitude"]
     user_lon = geo["coords"]["longitude"]
@@ -43,15 +72,24 @@ else:
 
 # ==================================================
 
-# ---------- Setup ----------
-if "nltk_ready" not in st.session_state:
-    nltk.download("vader_lexicon", quiet=True)
-    st.session_state["nltk_ready"] = True
-
-if "db_initialized" not in st.session_state:
+# ---------- Setup (sekali per proses server, bukan per sesi) ----------
+# Leksikon VADER sudah ikut di paket vaderSentiment, jadi tidak perlu download nltk.
+@st.cache_resource(show_spinner=False)
+def warm_up():
     init_db()
     insert_sample_sekolah_if_empty()
-    st.session_state["db_initialized"] = True
+    # Grid zonasi untuk sekolah yang baru/berubah koordinatnya (DB lama: dibangun penuh sekali)
+    refresh_zonasi_grid()
+    # Memo cache sentimen per proses, dengan tier kedua di feedback.db
+    get_default_cache(DB)
+    # Skor ulang ulasan lama di latar belakang jika leksikon berubah
+    start_background_rescore()
+    # Index LSH ulasan (deteksi ulasan hampir sama saat disimpan)
+    get_lsh_index()
+    return True
+
+with span("warm_up"):
+    warm_up()
 
 if "map_data" not in st.session_state:
     st.session_state["map_data"] = None
@@ -62,66 +100,63 @@ if "selected_school" not in st.session_state:
 if "zoom_center" not in st.session_state:
     st.session_state["zoom_center"] = None
 
-# ---------- Haversine ----------
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371000
-    dlat = radians(lat2 - lat1)
-    dlon = radians(lon2 - lon1)
-    a = sin(dlat/2)**2 + cos(radians(lat1))*cos(radians(lat2))*sin(dlon/2)**2
-    return R * (2 * atan2(sqrt(a), sqrt(1-a)))
-
 # ================= UI =================
 st.title("Radar Zonasi Sekolah Mandala — Analisis Sentimen")
 
 sekolah_df = load_sekolah_df()
-fb = load_feedback_df()
+
+# ---------- Index spasial (satu per proses, dibangun ulang hanya jika tabel sekolah berubah) ----------
+with span("sekolah_index"):
+    sekolah_index = cached("sekolah_index", ("sekolah",), lambda: SchoolIndex.from_df(load_sekolah_df()))
+
+# ---------- Registri sekolah: nama → id, koordinat, typeahead tanpa query DB (urutan baris = sekolah_df) ----------
+registry = load_sekolah_registry()
 
 # ================= MAP =================
 col1, col2 = st.columns([2,1])
 
-with col1:
+with col1, span("map"):
     center = st.session_state["zoom_center"] or ([user_lat, user_lon] if gps_ready else [-6.2, 106.8])
     zoom = 15 if st.session_state["zoom_center"] else 12
 
-    m = folium.Map(location=center, zoom_start=zoom)
+    # Peta dasar + plugin di-cache per proses; yang dikirim ulang tiap rerun hanya layer sekolah
+    m = base_map()
+    layer = folium.FeatureGroup(name="Sekolah")
 
-    # Plugins
-    Fullscreen(position="topright", title="Fullscreen", title_cancel="Exit Fullscreen", force_separate_button=True).add_to(m)
-    MeasureControl(position="bottomleft", primary_length_unit="meters").add_to(m)
-    folium.LayerControl(position="topright").add_to(m)
+    # Viewport: bounds terakhir dari peta selama tujuan tampilan (center/zoom) tidak berubah,
+    # selain itu perkiraan dari center/zoom yang akan dituju peta
+    target = (tuple(center), zoom)
+    view = st.session_state.get("peta") if st.session_state.get("map_target") == target else None
+    view_zoom = (view or {}).get("zoom") or zoom
+    bounds = pad_bounds(bounds_from_map_data(view) or view_bounds(center, zoom))
+    st.session_state["map_target"] = target
 
-    stats = {}
-    if not fb.empty:
-        g = fb.groupby("sekolah").agg({"pos_pct":"mean","id":"count"}).reset_index()
-        for _, r in g.iterrows():
-            stats[r["sekolah"]] = r
+    # Ringkasan per sekolah dijaga DB (tabel sekolah_stats), disejajarkan dengan baris sekolah_df
+    with span("marker_stats"):
+        marker_stats = cached("marker_stats", ("sekolah", "feedback"),
+                              lambda: school_stats_arrays(load_sekolah_df(), load_sekolah_stats_df()))
 
     if gps_ready:
-        folium.Marker([user_lat, user_lon], tooltip="📍 Lokasi Anda", icon=folium.Icon(color="blue", icon="user")).add_to(m)
+        folium.Marker([user_lat, user_lon], tooltip="📍 Lokasi Anda", icon=folium.Icon(color="blue", icon="user")).add_to(layer)
 
-    for _, r in sekolah_df.iterrows():
+    with span("viewport") as s:
+        visible_rows = sekolah_index.within_bounds(*bounds)
         if gps_ready and st.session_state.get("radius_on", True):
-            if haversine(user_lat, user_lon, r["lat"], r["lon"]) > st.session_state.get("radius", 1000):
-                continue
-
-        nama = r["nama"]
-        if nama in stats:
-            avg = stats[nama]["pos_pct"]
-            cnt = stats[nama]["id"]
-            popup = f"<b>{nama}</b><br>Sentimen: {avg:.1f}%<br>Ulasan: {cnt}"
-            color = "green" if avg >= 70 else "orange" if avg >= 40 else "red"
-        else:
-            popup = f"<b>{nama}</b><br>Belum ada ulasan"
-            color = "gray"
-
-        folium.CircleMarker(
-            [r["lat"], r["lon"]],
-            radius=8,
-            color=color,
-            fill=True,
-            popup=popup,
-            tooltip=folium.Tooltip(nama, permanent=True, direction="top")
-        ).add_to(m)
+            rows_in_radius, _ = sekolah_index.within_radius(user_lat, user_lon, st.session_state.get("radius", 1000))
+            visible_rows = np.intersect1d(visible_rows, rows_in_radius, assume_unique=True)
+        s.set(rows=len(visible_rows))
+
+    with span("build_school_layer", zoom=view_zoom) as s:
+        _, layer_mode = build_school_layer(sekolah_df, marker_stats, visible_rows, view_zoom, layer)
+        s.set(rows=len(visible_rows), mode=layer_mode)
+
+    # Heatmap cakupan: berapa sekolah yang radius zonasinya menjangkau setiap sel
+    coverage_on = st.session_state.get("coverage_on", False)
+    if coverage_on and view_zoom >= COVERAGE_MIN_ZOOM:
+        with span("coverage_heatmap") as s:
+            points = coverage_points(tier_for(st.session_state.get("radius", 1000)), bounds)
+            add_coverage_heatmap(layer, points)
+            s.set(rows=len(points))
 
     # radius circle
     if gps_ready and st.session_state.get("radius_on", True):
@@ -131,47 +166,63 @@ with col1:
             color="blue",
             fill=True,
             fill_opacity=0.08
-        ).add_to(m)
-
-    # Render map
-    map_data = st_folium(m, width=700, height=600)
+        ).add_to(layer)
+
+    # Render map: center/zoom dan layer diganti tanpa memuat ulang peta dasar di browser
+    with span("st_folium"):
+        map_data = st_folium(
+            m,
+            key="peta",
+            width=MAP_WIDTH,
+            height=MAP_HEIGHT,
+            center=center,
+            zoom=zoom,
+            feature_group_to_add=layer,
+            returned_objects=["last_object_clicked", "bounds", "zoom"],
+        )
     st.session_state["map_data"] = map_data
+    if coverage_on and view_zoom < COVERAGE_MIN_ZOOM:
+        st.caption("Perbesar peta untuk melihat heatmap cakupan zonasi.")
 
 # ================= MAP → SELECTBOX SYNC =================
 if map_data and map_data.get("last_object_clicked"):
     latc = map_data["last_object_clicked"]["lat"]
     lonc = map_data["last_object_clicked"]["lng"]
 
-    tmp = sekolah_df.copy()
-    tmp["dist"] = tmp.apply(lambda r: haversine(latc, lonc, r["lat"], r["lon"]), axis=1)
-    nearest = tmp.sort_values("dist").iloc[0]
+    nearest_rows, _ = sekolah_index.nearest(latc, lonc, 1)
+    if len(nearest_rows):
+        nearest = int(nearest_rows[0])
 
-    # Trigger hanya sekali
-    if st.session_state["selected_school"] != nearest["nama"]:
-        st.session_state["selected_school"] = nearest["nama"]
-        st.session_state["zoom_center"] = [nearest["lat"], nearest["lon"]]
+        # Trigger hanya sekali
+        if st.session_state["selected_school"] != registry.names[nearest]:
+            st.session_state["selected_school"] = registry.names[nearest]
+            st.session_state["zoom_center"] = [float(registry.lats[nearest]), float(registry.lons[nearest])]
 
 # ================= SIDEBAR =================
-with st.sidebar:
+SELECTBOX_MAX_OPTIONS = 500  # di atas ini pilihan sekolah lewat kotak pencarian
+with st.sidebar, span("sidebar"):
     st.header("Kontrol")
 
-    sekolah_list = sekolah_df["nama"].tolist()
-    if st.session_state["selected_school"] is None:
-        st.session_state["selected_school"] = sekolah_list[0]
+    # Pilihan lama yang sudah tidak ada di tabel sekolah (atau belum ada) → sekolah pertama
+    if st.session_state["selected_school"] not in registry:
+        st.session_state["selected_school"] = registry.names[0]
 
-    selected_school = st.selectbox(
-        "Pilih / Cari sekolah",
-        sekolah_list,
-        index=sekolah_list.index(st.session_state["selected_school"]),
-        key="selected_school"
-    )
+    # Sedikit sekolah → semua nama jadi opsi; lebih dari itu opsi diambil dari pencarian
+    # awalan registri agar selectbox tidak menerima puluhan ribu nama setiap rerun
+    if len(registry) <= SELECTBOX_MAX_OPTIONS:
+        sekolah_options = registry.names
+    else:
+        school_query = st.text_input("Cari nama sekolah", placeholder="mis. sma negeri 1, pagar alam")
+        sekolah_options = registry.search_names(school_query, SELECTBOX_MAX_OPTIONS)
+        if st.session_state["selected_school"] not in sekolah_options:
+            sekolah_options = [st.session_state["selected_school"]] + sekolah_options
+
+    selected_school = st.selectbox("Pilih / Cari sekolah", sekolah_options, key="selected_school")
 
     # Auto-zoom
-    row = sekolah_df[sekolah_df["nama"] == selected_school]
-    if not row.empty:
-        lat, lon = float(row.iloc[0]["lat"]), float(row.iloc[0]["lon"])
-        if st.session_state["zoom_center"] != [lat, lon]:
-            st.session_state["zoom_center"] = [lat, lon]
+    coords = registry.coords_of(selected_school)
+    if coords and st.session_state["zoom_center"] != list(coords):
+        st.session_state["zoom_center"] = list(coords)
 
     st.markdown("### 📡 Status GPS")
     if gps_ready:
@@ -182,12 +233,64 @@ with st.sidebar:
     st.subheader("Radius Zonasi")
     st.session_state["radius_on"] = st.toggle("Aktifkan Radius", value=True)
     st.session_state["radius"] = st.slider("Radius (meter)", 100, 10000, 1000, 100, disabled=not st.session_state["radius_on"])
+    st.session_state["coverage_on"] = st.toggle("Heatmap cakupan zonasi", value=False)
+
+    if gps_ready:
+        with span("schools_within") as s:
+            in_zone = schools_within(user_lat, user_lon, st.session_state["radius"])
+            s.set(rows=len(in_zone))
+        st.markdown(f"**{len(in_zone)} sekolah** dalam radius {st.session_state['radius']} m")
+        for _, nama_z, dist_z in in_zone[:10]:
+            st.caption(f"{nama_z} — {dist_z:.0f} m")
+
+    st.markdown("---")
+    st.toggle("🐞 Panel debug timing", key="debug_timing",
+              help="Waktu per tahap, jumlah baris dan waktu tunggu lock DB untuk setiap rerun")
+    debug_slot = st.empty()
 
 # ================= PANEL ULASAN =================
-with col2:
+REVIEW_PAGE_SIZE = 20
+
+def load_more_reviews():
+    # Ambil halaman berikutnya dan tambahkan ke daftar ulasan yang sudah tampil
+    df, cursor = load_feedback_page(
+        st.session_state["review_sekolah_id"], REVIEW_PAGE_SIZE, st.session_state["review_cursor"]
+    )
+    st.session_state["review_rows"].extend(zip(df["opini"], df["pos_pct"]))
+    st.session_state["review_cursor"] = cursor
+
+SEARCH_PAGE_SIZE = 20
+EXPORT_FORMATS = {"CSV": ("csv", "text/csv")}
+if importlib.util.find_spec("pyarrow") is not None:  # Parquet hanya jika pyarrow terpasang
+    EXPORT_FORMATS["Parquet"] = ("parquet", "application/vnd.apache.parquet")
+TREND_PERIODS = {"Mingguan": ("week", 52), "Harian": ("day", 90)}  # grain rollup, jumlah bucket terakhir
+
+def more_search_results():
+    st.session_state["search_limit"] += SEARCH_PAGE_SIZE
+
+def show_latest_reviews(nama):
+    st.session_state["review_school"] = nama
+    st.session_state["review_sekolah_id"] = load_sekolah_registry().id_of(nama)
+    st.session_state["review_rows"] = []
+    st.session_state["review_cursor"] = None
+    load_more_reviews()
+
+with col2, span("panel"):
     st.subheader("Panel Sekolah & Ulasan")
     st.markdown(f"**Sekolah terpilih:** {selected_school}")
 
+    # Tren dibaca dari tabel rollup harian/mingguan (dijaga trigger), bukan dari semua ulasan
+    with span("trend"):
+        trend_label = st.radio("📈 Tren sentimen", list(TREND_PERIODS), horizontal=True)
+        trend_grain, trend_periods = TREND_PERIODS[trend_label]
+        trend_df = load_sentiment_trend(registry.id_of(selected_school), trend_grain, trend_periods)
+        if trend_df.empty:
+            st.caption("Belum ada ulasan untuk grafik tren.")
+        else:
+            trend_df = trend_df.set_index(pd.to_datetime(trend_df["bucket"]))
+            st.line_chart(trend_df[["pos_pct"]], height=180)
+            st.bar_chart(trend_df[["review_count", "negative_count"]], height=120)
+
     if "last_comment_time" not in st.session_state:
         st.session_state["last_comment_time"] = 0
 
@@ -199,34 +302,98 @@ with col2:
         elif not opini.strip():
             st.warning("Opini kosong.")
         else:
-            pos, vader = detect_sentiment(opini)
-            found, corrected = correct_negative_sentence(opini)
-            sid = get_sekolah_id_by_nama(selected_school)
-            save_feedback(sid, opini, pos, vader)
-            st.session_state["last_comment_time"] = time.time()
-            st.success("Opini tersimpan.")
-            if found or vader < 0:
-                st.warning("Kalimat negatif terdeteksi. : " + corrected)
-
-    if st.button("Tampilkan Ulasan Terbaru"):
-        df_sel = fb[fb["sekolah"] == selected_school]
-        if df_sel.empty:
+            sid = registry.id_of(selected_school)
+            with span("find_near_duplicates") as s:
+                sig, duplicates = find_near_duplicates(opini, sekolah_id=sid)
+                s.set(rows=len(duplicates))
+            # Ulasan hampir sama hanya diperingatkan: orang tua berbeda wajar menulis ulasan pendek
+            # yang mirip. Klik simpan sekali lagi dengan teks yang sama → tetap disimpan.
+            if duplicates and st.session_state.get("confirm_duplicate") != (sid, opini):
+                st.session_state["confirm_duplicate"] = (sid, opini)
+                st.warning("Ulasan serupa sudah ada untuk sekolah ini: " + duplicates[0][3]
+                           + "\n\nKlik **Analisis & Simpan** sekali lagi untuk tetap menyimpan.")
+            else:
+                st.session_state["confirm_duplicate"] = None
+                with span("sentiment"):
+                    pos, vader = get_default_cache(DB).detect_sentiment(opini)
+                    found, corrected = correct_negative_sentence(opini, vader_score=vader)
+                with span("submit_feedback"):
+                    submit_feedback(sid, opini, pos, vader, LEXICON_VERSION, to_blob(sig))
+                st.session_state["last_comment_time"] = time.time()
+                st.success("Opini tersimpan.")
+                if found or vader < 0:
+                    st.warning("Kalimat negatif terdeteksi. : " + corrected)
+
+    st.button("Tampilkan Ulasan Terbaru", on_click=show_latest_reviews, args=(selected_school,))
+    if st.session_state.get("review_school") == selected_school:
+        review_rows = st.session_state["review_rows"]
+        if not review_rows:
             st.info("Belum ada ulasan.")
         else:
-            for _, r in df_sel.iterrows():
-                st.write(f"• {r['opini']} (Pos: {r['pos_pct']:.1f}%)")
+            for opini_r, pos_r in review_rows:
+                st.write(f"• {opini_r} (Pos: {pos_r:.1f}%)")
+        if st.session_state["review_cursor"] is not None:
+            st.button("Muat lebih banyak", on_click=load_more_reviews)
 
     st.markdown("---")
-    st.subheader("📥 Export CSV")
-    if st.button("Download CSV Ulasan Sekolah Terpilih"):
-        df_sel = fb[fb["sekolah"] == selected_school]
-        if df_sel.empty:
-            st.warning("Belum ada ulasan untuk sekolah ini.")
-        else:
-            csv = df_sel.to_csv(index=False).encode("utf-8")
-            st.download_button("⬇️ Download CSV", csv, f"ulasan_{selected_school}.csv", "text/csv")
+    st.subheader("🔎 Cari Ulasan")
+    search_query = st.text_input("Kata kunci (mis. kotor kasar, akhiran * untuk awalan kata)")
+    search_selected_only = st.checkbox("Hanya sekolah terpilih")
+    if search_query.strip():
+        search_sid = registry.id_of(selected_school) if search_selected_only else None
+        # Jumlah hasil yang tampil direset setiap kata kunci / filter berubah
+        if st.session_state.get("search_params") != (search_query, search_sid):
+            st.session_state["search_params"] = (search_query, search_sid)
+            st.session_state["search_limit"] = SEARCH_PAGE_SIZE
+        limit = st.session_state["search_limit"]
+        found_df = search_feedback(search_query, search_sid, limit + 1)
+        if found_df.empty:
+            st.info("Tidak ada ulasan yang cocok.")
+        for r in found_df.head(limit).itertuples(index=False):
+            score = f" (Pos: {r.pos_pct:.1f}%)" if pd.notna(r.pos_pct) else ""
+            st.markdown(f"• **{r.sekolah}** — {r.cuplikan}{score}")
+        if len(found_df) > limit:
+            st.button("Hasil berikutnya", on_click=more_search_results)
+
+    st.markdown("---")
+    st.subheader("📥 Export Ulasan")
+    export_label = st.radio("Format export", list(EXPORT_FORMATS), horizontal=True) if len(EXPORT_FORMATS) > 1 else "CSV"
+    if st.button("Siapkan File Ulasan Sekolah Terpilih"):
+        export_fmt, export_mime = EXPORT_FORMATS[export_label]
+        # Ditulis per chunk ke file sementara: satu salinan bytes untuk tombol download,
+        # tanpa DataFrame dan string CSV utuh di memori
+        with span("export"), tempfile.TemporaryFile() as export_file:
+            exported = export_feedback(export_file, export_fmt, sekolah_id=registry.id_of(selected_school))
+            if not exported:
+                st.warning("Belum ada ulasan untuk sekolah ini.")
+            else:
+                export_file.seek(0)
+                st.download_button(f"⬇️ Download {export_label} ({exported} ulasan)", export_file.read(),
+                                   f"ulasan_{selected_school}.{export_fmt}", export_mime)
 
     st.markdown("---")
     st.write("gusti mandala")
 
+# ================= DEBUG TIMING =================
+rerun_trace = end_trace()
+if rerun_trace is not None and st.session_state.get("debug_timing"):
+    with debug_slot.container():
+        st.caption(f"Rerun terakhir: {rerun_trace.total_ms:.1f} ms")
+        st.dataframe(
+            pd.DataFrame(
+                [("\u2003" * s.depth + s.name, round(s.ms or 0, 2), s.attrs.get("rows")) for s in rerun_trace.spans],
+                columns=["tahap", "ms", "baris"],
+            ),
+            hide_index=True,
+        )
+        for kind, (count, seconds) in rerun_trace.waits.items():
+            st.caption(f"Tunggu {kind}: {seconds * 1000:.2f} ms ({count}x)")
+        # Statistik proses (bukan per rerun): memo cache sentimen, antrian group commit jika aktif
+        st.caption("Cache sentimen (hit / miss / eviction, hit tier SQLite)")
+        st.json(get_default_cache(DB).stats(), expanded=False)
+        writer_stats = feedback_writer_stats()
+        if writer_stats is not None:
+            st.caption("Antrian tulis feedback (group commit)")
+            st.json(writer_stats, expanded=False)
+
 
@@ -0,0 +1 @@
+"""Skrip benchmark radar-zonasi. Jalankan dari root repo, misalnya: python -m benchmarks.scoring"""
@@ -0,0 +1,143 @@
+"""
+Generator korpus ulasan sekolah berbahasa Indonesia (deterministik per seed) untuk benchmark.
+Frasa sentimen diambil dari leksikon sentiment.py (custom_dict, vader_indo, corrections,
+phrase_corrections), ditambah negasi, penguat, kata gaul dan salah ketik.
+
+    python -m benchmarks.corpus --n 5
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sentiment import corrections, custom_dict, phrase_corrections, vader_indo  # noqa: E402
+
+SUBJECTS = [
+    "guru di sini", "gurunya", "kepala sekolah", "wali kelas", "pelayanan tata usaha", "kantin",
+    "kantin sekolah", "toilet", "kelasnya", "perpustakaan", "lab komputer", "lapangan olahraga",
+    "ekskul", "fasilitas", "satpam", "parkiran", "lingkungan sekolah", "proses PPDB", "seragamnya",
+    "mushola", "pembelajaran", "jadwal pelajaran", "ruang UKS", "koperasi", "wifi sekolah",
+]
+INTENSIFIERS = ["sangat", "sangat", "cukup", "agak", "terlalu", "lumayan"]  # sebelum frasa
+POST_INTENSIFIERS = ["banget", "sekali"]                                  # sesudah frasa
+NEGATIONS = ["tidak", "tidak", "kurang", "nggak", "gak", "belum", "bukan"]
+CONNECTORS = ["tapi", "dan", "juga", "namun", "cuma", "apalagi", "soalnya"]
+OPENERS = ["", "", "", "Menurut saya", "Jujur", "Anak saya bilang", "Sejauh ini", "Overall", "Secara umum"]
+CLOSERS = ["", "", "", "", "semoga makin maju", "mohon diperbaiki", "recommended", "terima kasih",
+           "pokoknya", "sih", "deh", "ya"]
+ENDINGS = [".", ".", "", "!", "!!", "...", " 👍", " 🙏", " 😡"]
+
+
+def _split_lexicon():
+    """Frasa positif/negatif menurut tanda skor vader_indo (custom_dict sebagai cadangan)."""
+    positive, negative = [], []
+    for phrase in dict.fromkeys(list(vader_indo) + list(custom_dict)):
+        if phrase in NEGATIONS or phrase in INTENSIFIERS or phrase in POST_INTENSIFIERS:
+            continue  # "tidak", "sekali" ... dipasang sendiri oleh generator
+        score = vader_indo.get(phrase, custom_dict.get(phrase, 0))
+        (positive if score > 0 else negative if score < 0 else positive).append(phrase)
+    return positive, negative
+
+
+POSITIVE, NEGATIVE = _split_lexicon()
+TYPO_WORDS = list(corrections)          # salah ketik yang dikenal leksikon ("banguus", "rammah", ...)
+HEDGED_PHRASES = list(phrase_corrections)  # "tidak terlalu bagus", "tidak cepat", ...
+
+
+def typo(word, rng):
+    """Salah ketik acak: huruf dobel, dua huruf tertukar, atau satu huruf hilang."""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.random()
+    if kind < 0.4:
+        return word[:i] + word[i] + word[i:]
+    if kind < 0.7:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + word[i + 1:]
+
+
+class ReviewGenerator:
+    """
+    Ulasan sintetis: 1-3 klausa "<subjek> [negasi] [penguat] <frasa sentimen>"
+    disambung kata hubung, dengan pembuka/penutup opsional. Parameter *_rate
+    mengatur seberapa sering negasi, frasa lunak, salah ketik dan duplikat muncul.
+    """
+
+    def __init__(self, seed=0, positive_share=0.6, negation_rate=0.15, hedge_rate=0.1,
+                 typo_rate=0.05, known_typo_rate=0.05, duplicate_rate=0.02):
+        self.rng = random.Random(seed)
+        self.positive_share = positive_share
+        self.negation_rate = negation_rate
+        self.hedge_rate = hedge_rate
+        self.typo_rate = typo_rate
+        self.known_typo_rate = known_typo_rate
+        self.duplicate_rate = duplicate_rate
+        self._recent = []
+
+    def clause(self, positive):
+        rng = self.rng
+        words = [rng.choice(SUBJECTS)]
+        if rng.random() < self.hedge_rate:
+            words.append(rng.choice(HEDGED_PHRASES))
+        elif rng.random() < self.known_typo_rate:
+            words.append(rng.choice(TYPO_WORDS))
+        else:
+            negated = rng.random() < self.negation_rate
+            if negated:
+                positive = not positive  # "tidak bagus" → frasa positif untuk kalimat negatif
+            phrase = rng.choice(POSITIVE if positive else NEGATIVE)
+            if negated and phrase.split()[0] not in NEGATIONS:
+                words.append(rng.choice(NEGATIONS))
+            if rng.random() < 0.25:
+                words.append(rng.choice(INTENSIFIERS))
+            words.append(phrase)
+            if rng.random() < 0.1 and phrase.split()[-1] not in POST_INTENSIFIERS:
+                words.append(rng.choice(POST_INTENSIFIERS))
+        return " ".join(words)
+
+    def review(self):
+        rng = self.rng
+        # Sebagian kecil ulasan dikirim ulang (hampir) sama, seperti di data asli
+        if self._recent and rng.random() < self.duplicate_rate:
+            return rng.choice(self._recent)
+        positive = rng.random() < self.positive_share
+        clauses = [self.clause(positive if rng.random() < 0.8 else not positive)
+                   for _ in range(rng.choice((1, 1, 2, 2, 3)))]
+        text = f" {rng.choice(CONNECTORS)} ".join(clauses)
+        opener, closer = rng.choice(OPENERS), rng.choice(CLOSERS)
+        if opener:
+            text = f"{opener}, {text}"
+        if closer:
+            text = f"{text}, {closer}"
+        words = [typo(w, rng) if rng.random() < self.typo_rate else w for w in text.split(" ")]
+        text = " ".join(words)
+        text = (text.upper() if rng.random() < 0.03 else text[0].upper() + text[1:]) + rng.choice(ENDINGS)
+        if len(self._recent) < 500:
+            self._recent.append(text)
+        else:
+            self._recent[rng.randrange(500)] = text
+        return text
+
+    def reviews(self, n):
+        return [self.review() for _ in range(n)]
+
+
+def generate_reviews(n, seed=0, **kwargs):
+    """n ulasan sintetis (list of str), sama persis untuk seed yang sama."""
+    return ReviewGenerator(seed, **kwargs).reviews(n)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    for text in generate_reviews(args.n, args.seed):
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
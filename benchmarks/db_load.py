@@ -0,0 +1,125 @@
+"""
+Load test koneksi DB: banyak "sesi" (thread) membaca dan sesekali menulis bersamaan.
+Melaporkan p50/p99 latensi baca dan tulis dalam JSON.
+
+    python -m benchmarks.db_load --sessions 32 --duration 10
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def _summary(values):
+    return {
+        "count": len(values),
+        "p50_ms": round(_percentile(values, 50) * 1000, 3) if values else None,
+        "p99_ms": round(_percentile(values, 99) * 1000, 3) if values else None,
+        "max_ms": round(max(values) * 1000, 3) if values else None,
+    }
+
+
+def seed(db, n_schools, n_reviews, rng):
+    db.init_db()
+    with db.db_lock:
+        c = db.conn_global.cursor()
+        c.executemany(
+            "INSERT OR IGNORE INTO sekolah (nama, info, lat, lon, akreditasi) VALUES (?, ?, ?, ?, ?)",
+            [(f"Sekolah {i}", "", -4 + rng.random(), 103 + rng.random(), "B") for i in range(n_schools)]
+        )
+        c.executemany(
+            "INSERT INTO feedback (sekolah_id, opini, pos_pct, vader_compound) VALUES (?, ?, ?, ?)",
+            [(rng.randint(1, n_schools), "ulasan sintetis bagus", rng.random() * 100, rng.random() - 0.5)
+             for _ in range(n_reviews)]
+        )
+        db.conn_global.commit()
+
+
+def session(db, n_schools, deadline, write_ratio, seed_value, reads, writes):
+    rng = random.Random(seed_value)
+    while time.perf_counter() < deadline:
+        sid = rng.randint(1, n_schools)
+        start = time.perf_counter()
+        if rng.random() < write_ratio:
+            db.save_feedback(sid, "ulasan load test", 50.0, 0.1)
+            writes.append(time.perf_counter() - start)
+            continue
+        op = rng.random()
+        if op < 0.4:
+            db.load_feedback_page(sid, 20)
+        elif op < 0.7:
+            db.get_sekolah_id_by_nama(f"Sekolah {sid - 1}")
+        else:
+            db.load_sekolah_stats_df()
+        reads.append(time.perf_counter() - start)
+
+
+def run(sessions=32, duration=10.0, n_schools=1000, n_reviews=50000, write_ratio=0.05, seed_value=0, serialized=False):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RADAR_ZONASI_DB"] = str(Path(tmp) / "load.db")
+        import db
+
+        if serialized:
+            # Pembanding: semua baca lewat koneksi penulis + db_lock (perilaku sebelum pool baca)
+            @contextmanager
+            def locked_conn():
+                with db.db_lock:
+                    yield db.conn_global
+            db.read_conn = locked_conn
+
+        rng = random.Random(seed_value)
+        seed(db, n_schools, n_reviews, rng)
+
+        reads, writes = [], []
+        deadline = time.perf_counter() + duration
+        threads = [
+            threading.Thread(target=session, args=(db, n_schools, deadline, write_ratio, seed_value + i, reads, writes))
+            for i in range(sessions)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        return {
+            "sessions": sessions,
+            "mode": "serialized" if serialized else "read_pool",
+            "duration_s": duration,
+            "pragmas": dict(db.PRAGMAS),
+            "read_pool_size": db.READ_POOL_SIZE,
+            "reads": _summary(reads),
+            "writes": _summary(writes),
+            "ops_per_sec": round((len(reads) + len(writes)) / duration, 1),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--schools", type=int, default=1000)
+    parser.add_argument("--reviews", type=int, default=50000)
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    parser.add_argument("--serialized", action="store_true", help="Baca lewat satu koneksi + lock global (pembanding)")
+    args = parser.parse_args(argv)
+    result = run(args.sessions, args.duration, args.schools, args.reviews, args.write_ratio, serialized=args.serialized)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
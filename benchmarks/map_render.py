@@ -0,0 +1,117 @@
+"""
+Ukuran payload HTML peta dan waktu build: cara lama (satu CircleMarker berlabel
+permanen untuk setiap sekolah) vs map_render (viewport + agregasi grid).
+
+    python -m benchmarks.map_render --schools 10000
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Pusat kota sintetis (sekitar Jawa/Sumatra); sekolah menyebar di sekitar pusat
+CITY_CENTERS = [(-6.2, 106.8), (-6.9, 107.6), (-7.25, 112.75), (-7.0, 110.4), (-3.0, 104.75),
+                (-5.45, 105.26), (-0.95, 100.35), (3.6, 98.67), (-7.8, 110.36), (-8.65, 115.2)]
+
+
+def synthetic_schools(n, seed=0):
+    import numpy as np
+    import pandas as pd
+
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        lat, lon = rng.choice(CITY_CENTERS)
+        rows.append((i + 1, f"Sekolah {i}", lat + rng.gauss(0, 0.08), lon + rng.gauss(0, 0.08)))
+    df = pd.DataFrame(rows, columns=["id", "nama", "lat", "lon"])
+    pos = np.array([rng.random() * 100 if rng.random() < 0.6 else np.nan for _ in range(n)])
+    cnt = np.where(np.isnan(pos), 0, [rng.randint(1, 50) for _ in range(n)]).astype(np.int64)
+    return df, (pos, cnt)
+
+
+def legacy_map(df, stats, center, zoom):
+    """Perilaku app.py sebelumnya: Map baru + plugin + marker berlabel untuk semua sekolah."""
+    import folium
+    from folium.plugins import Fullscreen, MeasureControl
+    from map_render import _school_marker
+
+    m = folium.Map(location=center, zoom_start=zoom)
+    Fullscreen(position="topright", title="Fullscreen", title_cancel="Exit Fullscreen", force_separate_button=True).add_to(m)
+    MeasureControl(position="bottomleft", primary_length_unit="meters").add_to(m)
+    folium.LayerControl(position="topright").add_to(m)
+    pos, cnt = stats
+    for i, r in enumerate(df.itertuples(index=False)):
+        _school_marker(r.nama, r.lat, r.lon, pos[i], cnt[i], True).add_to(m)
+    return m
+
+
+def new_map(df, stats, index, center, zoom):
+    from map_render import base_map, build_school_layer, pad_bounds, view_bounds
+
+    m = base_map()
+    rows = index.within_bounds(*pad_bounds(view_bounds(center, zoom)))
+    layer, mode = build_school_layer(df, stats, rows, zoom)
+    return m, layer, mode, len(rows)
+
+
+def _timed(fn, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times)
+
+
+def run(n_schools=10000, zooms=(8, 11, 13, 15), repeat=3, seed=0, legacy=True):
+    from map_render import base_map
+    from spatial import SchoolIndex
+
+    df, stats = synthetic_schools(n_schools, seed)
+    index = SchoolIndex.from_df(df)
+    center = CITY_CENTERS[0]
+    base_bytes = len(base_map().get_root().render())
+    results = {"schools": n_schools, "base_map_bytes": base_bytes, "legacy": None, "viewport": []}
+
+    if legacy:
+        def build_legacy():
+            m = legacy_map(df, stats, center, 12)
+            return len(m.get_root().render())
+        html_bytes, seconds = _timed(build_legacy, 1)
+        results["legacy"] = {"markers": n_schools, "html_bytes": html_bytes, "build_render_s": round(seconds, 4)}
+
+    for zoom in zooms:
+        def build_new():
+            m, layer, mode, rows = new_map(df, stats, index, center, zoom)
+            layer.add_to(m)
+            return mode, rows, len(layer._children), len(m.get_root().render())
+        (mode, rows, markers, html_bytes), seconds = _timed(build_new, repeat)
+        results["viewport"].append({
+            "zoom": zoom,
+            "mode": mode,
+            "schools_in_view": rows,
+            "markers": markers,
+            "html_bytes": html_bytes,
+            "layer_bytes": html_bytes - base_bytes,
+            "build_render_s": round(seconds, 4),
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--schools", type=int, default=10000)
+    parser.add_argument("--zooms", type=int, nargs="+", default=[8, 11, 13, 15])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-legacy", action="store_true", help="Lewati pembanding cara lama (lambat untuk data besar)")
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.schools, tuple(args.zooms), args.repeat, legacy=not args.no_legacy), indent=2))
+
+
+if __name__ == "__main__":
+    main()
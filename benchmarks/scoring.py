@@ -0,0 +1,63 @@
+"""
+Throughput scoring pos_pct: detect_sentiment per teks vs TokenMatrixScorer per batch.
+
+    python -m benchmarks.scoring --n 5000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sentiment import corrections, custom_dict, detect_sentiment, phrase_corrections, vader_indo  # noqa: E402
+from sentiment_matrix import TokenMatrixScorer  # noqa: E402
+
+
+def sample_corpus(n, seed=0):
+    """Korpus sederhana dari frasa leksikon + kata pengisi (deterministik per seed)."""
+    rng = random.Random(seed)
+    phrases = list(custom_dict) + list(vader_indo) + list(corrections) + list(phrase_corrections)
+    filler = ["sekolah", "guru", "kelas", "nya", "yang", "dan", "di", "tapi", "juga", "sekali"]
+    corpus = []
+    for _ in range(n):
+        parts = [rng.choice(phrases) if rng.random() < 0.5 else rng.choice(filler) for _ in range(rng.randint(3, 20))]
+        corpus.append(" ".join(parts).capitalize() + rng.choice([".", "!", "", "!!"]))
+    return corpus
+
+
+def run(n=5000, seed=0):
+    corpus = sample_corpus(n, seed)
+
+    start = time.perf_counter()
+    per_text = [detect_sentiment(t)[0] for t in corpus]
+    per_text_s = time.perf_counter() - start
+
+    scorer = TokenMatrixScorer()
+    start = time.perf_counter()
+    batch = scorer.pos_pct(corpus)
+    batch_s = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(per_text, batch.tolist()) if a != b)
+    return {
+        "n_texts": n,
+        "per_text_seconds": round(per_text_s, 4),
+        "per_text_texts_per_sec": round(n / per_text_s, 1),
+        "matrix_seconds": round(batch_s, 4),
+        "matrix_texts_per_sec": round(n / batch_s, 1),
+        "parity_mismatches": mismatches,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.n, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Latensi cold start: waktu import sentiment / db dan waktu render pertama app.py.
+Setiap pengukuran berjalan di proses Python baru agar cache modul tidak ikut terhitung.
+
+    python -m benchmarks.startup --repeat 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = """
+import time
+t = time.perf_counter()
+import {module}
+print(time.perf_counter() - t)
+"""
+
+# Render pertama (proses baru) lalu rerun di proses yang sama (cache_resource sudah hangat)
+RENDER_SNIPPET = """
+import time
+from streamlit.testing.v1 import AppTest
+t = time.perf_counter()
+at = AppTest.from_file("app.py", default_timeout=120).run()
+first = time.perf_counter() - t
+if at.exception:
+    raise SystemExit(str(at.exception))
+t = time.perf_counter()
+at.run()
+print(first, time.perf_counter() - t)
+"""
+
+
+def _run(snippet, env):
+    out = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+    return [float(x) for x in out.split()]
+
+
+def _summary(values):
+    return {"median_s": round(statistics.median(values), 4), "min_s": round(min(values), 4), "runs": len(values)}
+
+
+def run(repeat=3):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, RADAR_ZONASI_DB=str(Path(tmp) / "bench.db"))
+        for module in ("sentiment", "db"):
+            values = [_run(IMPORT_SNIPPET.format(module=module), env)[0] for _ in range(repeat)]
+            results[f"import_{module}"] = _summary(values)
+        first, rerun = [], []
+        for _ in range(repeat):
+            a, b = _run(RENDER_SNIPPET, env)
+            first.append(a)
+            rerun.append(b)
+        results["app_first_render"] = _summary(first)
+        results["app_rerun"] = _summary(rerun)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
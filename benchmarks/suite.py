@@ -0,0 +1,253 @@
+"""
+Benchmark gabungan dengan hasil JSON yang bisa dibandingkan antar run:
+throughput clean_text / detect_sentiment / correct_negative_sentence pada korpus sintetis,
+latensi load_sekolah_df / load_feedback_df, waktu build peta dan lookup/typeahead registri sekolah pada DB sintetis
+(benchmarks.synthetic_db) untuk setiap skala.
+
+    python -m benchmarks.suite --scales 1k 100k --output hasil.json
+    python -m benchmarks.suite --scales 1k 100k --compare hasil_lama.json   # exit 1 jika regresi
+
+Setiap skala DB diukur di proses baru (modul db terikat ke satu file database per proses).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+MAP_ZOOMS = (8, 11, 14)
+LEGACY_MAX_SCHOOLS = 5000  # pembanding marker per sekolah terlalu lambat di atas ini
+
+
+def _timed(fn, repeat):
+    """(hasil terakhir, list durasi detik)."""
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, times
+
+
+def _summary_ms(times):
+    return {"median_ms": round(statistics.median(times) * 1000, 3), "min_ms": round(min(times) * 1000, 3)}
+
+
+# ------------------- Teks -------------------
+def run_text(n=20000, repeat=3, seed=0):
+    from benchmarks.corpus import generate_reviews
+    from sentiment import clean_text, correct_negative_sentence, detect_sentiment
+
+    corpus = generate_reviews(n, seed)
+    results = {"n_texts": n, "avg_chars": round(sum(map(len, corpus)) / n, 1)}
+    for name, fn in (
+        ("clean_text", clean_text),
+        ("detect_sentiment", detect_sentiment),
+        ("correct_negative_sentence", correct_negative_sentence),
+    ):
+        _, times = _timed(lambda: [fn(t) for t in corpus], repeat)
+        best = min(times)
+        results[name] = {"texts_per_sec": round(n / best, 1), "us_per_text": round(best / n * 1e6, 2)}
+    return results
+
+
+# ------------------- DB (dijalankan di proses anak per skala) -------------------
+def run_db(path, repeat=5, legacy=True):
+    os.environ["RADAR_ZONASI_DB"] = str(path)
+    import db
+    from benchmarks.map_render import CITY_CENTERS, legacy_map, new_map
+    from map_render import school_stats_arrays
+    from registry import SchoolRegistry
+    from spatial import SchoolIndex
+
+    db.init_db()
+    results = {}
+    for name, loader in (("load_sekolah_df", db.load_sekolah_df), ("load_feedback_df", db.load_feedback_df)):
+        cold = []
+        for _ in range(repeat):
+            db.data_cache = db.DataCache(db.CACHE_MAX_BYTES)  # cache kosong = sesi pertama setelah start
+            start = time.perf_counter()
+            df = loader()
+            cold.append(time.perf_counter() - start)
+        _, warm = _timed(loader, repeat)
+        results[name] = {"rows": len(df), "cold": _summary_ms(cold), "warm": _summary_ms(warm)}
+
+    sekolah_df = db.load_sekolah_df()
+    (stats, index), prep = _timed(
+        lambda: (school_stats_arrays(sekolah_df, db.load_sekolah_stats_df()), SchoolIndex.from_df(sekolah_df)), 1
+    )
+    center = CITY_CENTERS[0]
+    results["map"] = {"schools": len(sekolah_df), "prepare_ms": round(prep[0] * 1000, 3), "viewport": []}
+    for zoom in MAP_ZOOMS:
+        def build():
+            m, layer, mode, rows = new_map(sekolah_df, stats, index, center, zoom)
+            layer.add_to(m)
+            return mode, rows, len(m.get_root().render())
+        (mode, rows, html_bytes), times = _timed(build, repeat)
+        results["map"]["viewport"].append({
+            "zoom": zoom, "mode": mode, "schools_in_view": rows, "html_bytes": html_bytes, **_summary_ms(times),
+        })
+    if legacy and len(sekolah_df) <= LEGACY_MAX_SCHOOLS:
+        # Loop marker lama app.py: satu CircleMarker berlabel per sekolah
+        html_bytes, times = _timed(lambda: len(legacy_map(sekolah_df, stats, center, 12).get_root().render()), 1)
+        results["map"]["legacy"] = {"markers": len(sekolah_df), "html_bytes": html_bytes, **_summary_ms(times)}
+
+    # Registri: lookup nama → id dan pencarian awalan (5 huruf pertama nama) untuk ~1000 nama
+    registry, build_times = _timed(lambda: SchoolRegistry.from_df(sekolah_df), 1)
+    probe = registry.names[::max(1, len(registry) // 1000)]
+    _, lookup = _timed(lambda: [registry.id_of(n) for n in probe], repeat)
+    _, search = _timed(lambda: [registry.search(n[:5], 50) for n in probe], repeat)
+    results["registry"] = {
+        "schools": len(registry), "build_ms": round(build_times[0] * 1000, 3),
+        "lookups_per_sec": round(len(probe) / min(lookup), 1), "searches_per_sec": round(len(probe) / min(search), 1),
+    }
+    return results
+
+
+def _subprocess_json(args):
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", *args],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out)
+
+
+def run_scale(scale, data_dir, repeat=5, seed=0, rebuild=False, legacy=True):
+    path = Path(data_dir) / f"bench_{scale}_seed{seed}.db"
+    built = None
+    if rebuild or not path.exists():
+        built = _subprocess_json(["--build", scale, "--db", str(path), "--seed", str(seed)])
+    result = _subprocess_json(["--measure-db", str(path), "--repeat", str(repeat)] + ([] if legacy else ["--no-legacy"]))
+    result["db"] = built or {"path": str(path), "scale": scale, "seed": seed, "reused": True}
+    return result
+
+
+# ------------------- Metadata & perbandingan -------------------
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata():
+    import numpy
+    import pandas
+    import sqlite3
+    from sentiment import LEXICON_VERSION
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "sqlite": sqlite3.sqlite_version,
+        "lexicon_version": LEXICON_VERSION,
+    }
+
+
+def flatten(results, prefix=""):
+    """Metrik numerik sebagai {"a.b.c": nilai}; list diberi kunci indeks/zoom."""
+    flat = {}
+    items = results.items() if isinstance(results, dict) else (
+        (str(v.get("zoom", i)) if isinstance(v, dict) else str(i), v) for i, v in enumerate(results)
+    )
+    for key, value in items:
+        name = f"{prefix}{key}"
+        if isinstance(value, (dict, list)):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(current, baseline, tolerance=0.25):
+    """
+    Bandingkan metrik waktu (*_ms, *_s) dan throughput (*_per_sec) dengan baseline.
+    Kembalikan list regresi: (metrik, baseline, sekarang, perubahan relatif).
+    """
+    now, old = flatten(current.get("results", current)), flatten(baseline.get("results", baseline))
+    regressions = []
+    for key, value in now.items():
+        base = old.get(key)
+        if not base:
+            continue
+        if key.endswith("_per_sec"):
+            change = (base - value) / base      # throughput turun
+        elif key.endswith(("_ms", "_s")) and not key.endswith("min_ms"):
+            change = (value - base) / base      # waktu naik
+        else:
+            continue
+        if change > tolerance:
+            regressions.append((key, base, value, round(change, 3)))
+    return regressions
+
+
+def run(scales=("1k", "100k"), n_texts=20000, repeat=5, seed=0, data_dir=None, rebuild=False, legacy=True):
+    results = {"text": run_text(n_texts, min(repeat, 3), seed), "db": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            results["db"][scale] = run_scale(scale, data_dir or tmp, repeat, seed, rebuild, legacy)
+    return {"meta": metadata(), "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="*", default=["1k", "100k"], help="Skala DB: 1k, 100k, 1m")
+    parser.add_argument("--texts", type=int, default=20000, help="Jumlah ulasan untuk benchmark teks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=None, help="Simpan/pakai ulang DB sintetis di folder ini")
+    parser.add_argument("--rebuild", action="store_true", help="Bangun ulang DB sintetis walau sudah ada")
+    parser.add_argument("--no-legacy", action="store_true", help="Lewati pembanding marker per sekolah")
+    parser.add_argument("--output", default=None, help="Tulis hasil JSON ke file ini")
+    parser.add_argument("--compare", default=None, help="File JSON hasil sebelumnya sebagai baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Perubahan relatif yang dianggap regresi")
+    # Dipakai run_scale() untuk proses anak
+    parser.add_argument("--build", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--measure-db", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--db", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.build:
+        from benchmarks.synthetic_db import build
+        print(json.dumps(build(args.db, args.build, seed=args.seed)))
+        return
+    if args.measure_db:
+        print(json.dumps(run_db(args.measure_db, args.repeat, legacy=not args.no_legacy)))
+        return
+
+    for scale in args.scales:
+        from benchmarks.synthetic_db import SCALES
+        if scale not in SCALES:
+            parser.error(f"skala tidak dikenal: {scale} (pilih dari {', '.join(SCALES)})")
+    report = run(args.scales, args.texts, args.repeat, args.seed, args.data_dir, args.rebuild, not args.no_legacy)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance)
+        for key, base, value, change in regressions:
+            print(f"REGRESI {key}: {base} → {value} ({change:+.0%})", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Database sekolah/feedback sintetis untuk benchmark, pada skala 1k / 100k / 1M ulasan.
+Skema dibuat lewat db.init_db(), jadi trigger (sekolah_stats, FTS, versi data) ikut terisi
+seperti di produksi. Sekolah tersebar di sekitar beberapa kota; ulasan dari benchmarks.corpus.
+
+    python -m benchmarks.synthetic_db --scale 100k --output bench_100k.db
+
+Modul db membaca RADAR_ZONASI_DB saat di-import, jadi build() harus dipanggil
+sebelum db di-import di proses yang sama (atau jalankan lewat perintah di atas).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Skala → (jumlah ulasan, jumlah sekolah)
+SCALES = {
+    "1k": (1_000, 100),
+    "100k": (100_000, 5_000),
+    "1m": (1_000_000, 50_000),
+}
+CITY_CENTERS = [(-6.2, 106.8), (-6.9, 107.6), (-7.25, 112.75), (-7.0, 110.4), (-3.0, 104.75),
+                (-5.45, 105.26), (-0.95, 100.35), (3.6, 98.67), (-7.8, 110.36), (-8.65, 115.2)]
+JENJANG = ["SD Negeri", "SMP Negeri", "SMA Negeri", "SMK Negeri", "SD IT", "SMP Swasta", "SMA Swasta", "MA"]
+REVIEW_DAYS = 730  # created_at tersebar dalam 2 tahun terakhir
+
+
+def school_rows(n, seed=0):
+    """Baris (nama, info, lat, lon, akreditasi) untuk n sekolah."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        city = rng.randrange(len(CITY_CENTERS))
+        lat, lon = CITY_CENTERS[city]
+        rows.append((
+            f"{rng.choice(JENJANG)} {i + 1} Kota {city + 1}",
+            f"Jl. Sintetis No. {rng.randint(1, 300)}, Kota {city + 1}",
+            round(lat + rng.gauss(0, 0.08), 7),
+            round(lon + rng.gauss(0, 0.08), 7),
+            rng.choice("AAABBBBC"),
+        ))
+    return rows
+
+
+def build(path, scale="100k", n_reviews=None, n_schools=None, seed=0, chunk_size=20_000, score=True, progress=None):
+    """
+    Buat DB sintetis di path (file lama ditimpa). Kembalikan ringkasan (dict).
+    score=True → pos_pct/vader_compound dihitung dengan leksikon saat ini (detect_sentiment);
+    False → skor acak (lebih cepat untuk skala besar, lexicon_version NULL).
+    """
+    path = Path(path)
+    if "db" in sys.modules and Path(sys.modules["db"].DB).resolve() != path.resolve():
+        raise RuntimeError("db sudah di-import dengan database lain; jalankan build() di proses baru")
+    default_reviews, default_schools = SCALES[scale]
+    n_reviews = default_reviews if n_reviews is None else n_reviews
+    n_schools = default_schools if n_schools is None else n_schools
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+    os.environ["RADAR_ZONASI_DB"] = str(path)
+
+    import db
+    from benchmarks.corpus import ReviewGenerator
+    from sentiment import LEXICON_VERSION, detect_sentiment
+
+    start = time.perf_counter()
+    db.init_db()
+    db.insert_or_update_sekolah(school_rows(n_schools, seed), refresh_zonasi=False)
+    rng = random.Random(seed + 1)
+    generator = ReviewGenerator(seed)
+    now = datetime(2025, 1, 1)
+    written = 0
+    while written < n_reviews:
+        texts = generator.reviews(min(chunk_size, n_reviews - written))
+        rows = []
+        for text in texts:
+            if score:
+                pos, vader = detect_sentiment(text)
+                version = LEXICON_VERSION
+            else:
+                pos, vader, version = rng.random() * 100, rng.uniform(-1, 1), None
+            created_at = now - timedelta(seconds=rng.randrange(REVIEW_DAYS * 86400))
+            # Sekolah populer dapat lebih banyak ulasan (distribusi condong)
+            sid = min(n_schools, int(rng.paretovariate(1.2))) if rng.random() < 0.3 else rng.randint(1, n_schools)
+            rows.append((sid, text, pos, vader, version, created_at.strftime("%Y-%m-%d %H:%M:%S"), None))
+        db.import_feedback_many(rows)
+        written += len(rows)
+        if progress:
+            progress(written, time.perf_counter() - start)
+    with db.db_lock:
+        db.conn_global.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return {
+        "path": str(path),
+        "scale": scale,
+        "schools": n_schools,
+        "reviews": n_reviews,
+        "seed": seed,
+        "scored": score,
+        "build_s": round(time.perf_counter() - start, 2),
+        "bytes": path.stat().st_size,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="100k")
+    parser.add_argument("--output", required=True, help="Path file database (ditimpa)")
+    parser.add_argument("--reviews", type=int, default=None, help="Ganti jumlah ulasan dari skala")
+    parser.add_argument("--schools", type=int, default=None, help="Ganti jumlah sekolah dari skala")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-score", action="store_true", help="Skor acak, tanpa detect_sentiment")
+    args = parser.parse_args(argv)
+    summary = build(args.output, args.scale, args.reviews, args.schools, args.seed, score=not args.no_score,
+                    progress=lambda rows, s: print(f"{rows} ulasan ({s:.0f} detik)", file=sys.stderr, flush=True))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
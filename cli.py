@@ -0,0 +1,229 @@
+"""
+Perintah baris untuk pemeliharaan database radar-zonasi.
+
+Contoh:
+    python cli.py rescore --workers 4 --chunk-size 2000
+    python cli.py rescore --stale
+    python cli.py rebuild-stats
+    python cli.py rebuild-zonasi
+    python cli.py rebuild-fts
+    python cli.py rebuild-rollups
+    python cli.py export-feedback dump/ulasan.csv.gz --since 2024-01-01
+    python cli.py export-feedback dump/ulasan.parquet
+    python cli.py import-sekolah registri_sekolah.geojson --chunk-size 5000
+    python cli.py import-feedback arsip_ulasan.jsonl --score --workers 4
+    python cli.py dedup-backfill
+    python cli.py dedup-report --threshold 0.8 --output duplikat.json
+"""
+import argparse
+import json
+import time
+from datetime import date
+
+
+def _iso_date(value):
+    """Tipe argparse: YYYY-MM-DD yang valid, agar filter tanggal tidak diam-diam jadi NULL di SQLite."""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tanggal harus YYYY-MM-DD: {value!r}")
+
+
+def _print_progress(rows, seconds):
+    rate = rows / seconds if seconds > 0 else 0.0
+    print(f"{rows} baris  ({rate:.0f} baris/detik)", flush=True)
+
+
+def cmd_rescore(args):
+    from db import init_db
+    from rescore import rescore_feedback, rescore_stale
+    init_db()
+    if args.stale:
+        total = rescore_stale(
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            progress=_print_progress,
+            from_start=args.from_start,
+        )
+    else:
+        total = rescore_feedback(chunk_size=args.chunk_size, workers=args.workers, progress=_print_progress)
+    print(f"Selesai: {total} baris di-skor ulang.")
+
+
+def cmd_rebuild_stats(args):
+    from db import init_db, rebuild_sekolah_stats
+    init_db()
+    print(f"sekolah_stats dibangun ulang: {rebuild_sekolah_stats()} sekolah.")
+
+
+def cmd_rebuild_zonasi(args):
+    from db import init_db, rebuild_zonasi_grid, refresh_zonasi_grid
+    init_db()
+    total = refresh_zonasi_grid() if args.pending else rebuild_zonasi_grid()
+    print(f"Grid zonasi dihitung ulang: {total} sekolah.")
+
+
+def cmd_rebuild_fts(args):
+    from db import init_db, rebuild_feedback_fts
+    init_db()
+    print(f"Index pencarian ulasan dibangun ulang: {rebuild_feedback_fts()} ulasan.")
+
+
+def cmd_dedup_backfill(args):
+    from db import init_db
+    from dedup import backfill_minhash
+    init_db()
+    total = backfill_minhash(chunk_size=args.chunk_size, progress=_print_progress)
+    print(f"Selesai: signature MinHash dihitung untuk {total} ulasan.")
+
+
+def cmd_dedup_report(args):
+    from db import init_db
+    from dedup import backfill_minhash, dedup_report
+    init_db()
+    # Ulasan lama tanpa signature ikut dihitung dulu agar laporan lengkap
+    backfill_minhash()
+    summary, clusters = dedup_report(threshold=args.threshold, min_words=args.min_words)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "clusters": clusters}, f, ensure_ascii=False, indent=2)
+    print(f"{summary['reviews']} ulasan dicek: {summary['clusters']} kelompok hampir sama "
+          f"({summary['reviews_in_clusters']} ulasan).")
+    for cl in clusters[:args.top]:
+        schools = ", ".join(f"#{sid} x{n}" for sid, n in list(cl["schools"].items())[:5])
+        print(f"  - {cl['size']} ulasan [{schools}]: {cl['sample']!r}")
+
+
+def cmd_rebuild_rollups(args):
+    from db import init_db, rebuild_feedback_rollups
+    init_db()
+    counts = rebuild_feedback_rollups()
+    print("Rollup tren dibangun ulang: " + ", ".join(f"{grain} {n} baris" for grain, n in counts.items()) + ".")
+
+
+def cmd_export_feedback(args):
+    from db import get_sekolah_id_by_nama, init_db, export_feedback
+    init_db()
+    fmt = args.format or ("parquet" if args.path.endswith(".parquet") else "csv")
+    sekolah_id = args.sekolah_id
+    if args.sekolah is not None:
+        sekolah_id = get_sekolah_id_by_nama(args.sekolah)
+        if sekolah_id is None:
+            raise SystemExit(f"Sekolah tidak ditemukan: {args.sekolah}")
+    start = time.perf_counter()
+    total = export_feedback(args.path, fmt, sekolah_id=sekolah_id, start=args.since, end=args.until,
+                            chunk_size=args.chunk_size,
+                            progress=lambda rows: _print_progress(rows, time.perf_counter() - start))
+    print(f"Selesai: {total} ulasan ditulis ke {args.path} ({fmt}).")
+
+
+def _print_import_report(report):
+    summary = report.as_dict()
+    print(f"Selesai: {summary['rows']} baris diimpor, {summary['skipped']} dilewati "
+          f"({summary['rows_per_sec'] or 0:.0f} baris/detik).")
+    for err in summary["errors"]:
+        print(f"  - {err}")
+
+
+def cmd_import_sekolah(args):
+    from db import init_db
+    from importer import INDONESIA_BBOX, import_sekolah
+    init_db()
+    report = import_sekolah(
+        args.path,
+        fmt=args.format,
+        chunk_size=args.chunk_size,
+        bbox=None if args.no_bbox else INDONESIA_BBOX,
+        progress=_print_progress,
+    )
+    _print_import_report(report)
+
+
+def cmd_import_feedback(args):
+    from db import init_db
+    from importer import import_feedback
+    init_db()
+    report = import_feedback(
+        args.path,
+        fmt=args.format,
+        chunk_size=args.chunk_size,
+        score=args.score,
+        workers=args.workers,
+        progress=_print_progress,
+    )
+    _print_import_report(report)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Radar Zonasi — perintah pemeliharaan")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("rescore", help="Hitung ulang skor sentimen semua feedback")
+    p.add_argument("--chunk-size", type=int, default=2000, help="Jumlah baris per chunk baca/tulis")
+    p.add_argument("--workers", type=int, default=None, help="Jumlah proses worker (default: jumlah CPU)")
+    p.add_argument("--stale", action="store_true", help="Hanya baris dengan versi leksikon berbeda (bisa dilanjutkan)")
+    p.add_argument("--from-start", action="store_true", help="Dengan --stale: abaikan checkpoint, mulai dari id pertama")
+    p.set_defaults(func=cmd_rescore)
+
+    p = sub.add_parser("rebuild-stats", help="Bangun ulang ringkasan sentimen per sekolah dari tabel feedback")
+    p.set_defaults(func=cmd_rebuild_stats)
+
+    p = sub.add_parser("rebuild-zonasi", help="Hitung ulang grid zonasi (kandidat sekolah per sel dan tier radius)")
+    p.add_argument("--pending", action="store_true", help="Hanya sekolah yang koordinatnya baru/berubah")
+    p.set_defaults(func=cmd_rebuild_zonasi)
+
+    p = sub.add_parser("rebuild-fts", help="Isi ulang index full-text ulasan (feedback_fts) dari tabel feedback")
+    p.set_defaults(func=cmd_rebuild_fts)
+
+    p = sub.add_parser("rebuild-rollups", help="Hitung ulang rollup sentimen harian/mingguan dari tabel feedback")
+    p.set_defaults(func=cmd_rebuild_rollups)
+
+    formats = ("csv", "jsonl", "json")
+
+    p = sub.add_parser("import-sekolah", help="Impor / update sekolah dari CSV, JSONL atau GeoJSON")
+    p.add_argument("path", help="File sumber")
+    p.add_argument("--format", choices=formats, default=None, help="Default: dari ekstensi file")
+    p.add_argument("--chunk-size", type=int, default=5000, help="Jumlah baris per transaksi")
+    p.add_argument("--no-bbox", action="store_true", help="Jangan tolak koordinat di luar wilayah Indonesia")
+    p.set_defaults(func=cmd_import_sekolah)
+
+    p = sub.add_parser("import-feedback", help="Impor arsip ulasan dari CSV, JSONL atau JSON")
+    p.add_argument("path", help="File sumber")
+    p.add_argument("--format", choices=formats, default=None, help="Default: dari ekstensi file")
+    p.add_argument("--chunk-size", type=int, default=2000, help="Jumlah baris per transaksi")
+    p.add_argument("--score", action="store_true", help="Hitung skor sentimen saat impor")
+    p.add_argument("--workers", type=int, default=1, help="Dengan --score: jumlah proses worker")
+    p.set_defaults(func=cmd_import_feedback)
+
+    p = sub.add_parser("export-feedback", help="Export ulasan ke CSV (.csv / .csv.gz) atau Parquet, bertahap per chunk")
+    p.add_argument("path", help="File tujuan (ditulis ke .tmp lalu di-rename)")
+    p.add_argument("--format", choices=("csv", "parquet"), default=None, help="Default: dari ekstensi file")
+    group = p.add_mutually_exclusive_group()
+    group.add_argument("--sekolah-id", type=int, default=None, help="Hanya ulasan satu sekolah (id)")
+    group.add_argument("--sekolah", default=None, help="Hanya ulasan satu sekolah (nama)")
+    p.add_argument("--since", type=_iso_date, default=None, help="Tanggal awal YYYY-MM-DD (inklusif)")
+    p.add_argument("--until", type=_iso_date, default=None, help="Tanggal akhir YYYY-MM-DD (inklusif)")
+    p.add_argument("--chunk-size", type=int, default=10000, help="Baris per chunk / row group Parquet")
+    p.set_defaults(func=cmd_export_feedback)
+
+    p = sub.add_parser("dedup-backfill", help="Hitung signature MinHash untuk ulasan yang belum punya")
+    p.add_argument("--chunk-size", type=int, default=2000, help="Jumlah baris per transaksi")
+    p.set_defaults(func=cmd_dedup_backfill)
+
+    p = sub.add_parser("dedup-report", help="Laporan kelompok ulasan hampir sama di seluruh riwayat")
+    p.add_argument("--threshold", type=float, default=0.8, help="Estimasi Jaccard minimum (0-1)")
+    p.add_argument("--min-words", type=int, default=3, help="Abaikan ulasan yang lebih pendek dari ini")
+    p.add_argument("--top", type=int, default=20, help="Jumlah kelompok terbesar yang dicetak")
+    p.add_argument("--output", default=None, help="Simpan laporan lengkap sebagai JSON")
+    p.set_defaults(func=cmd_dedup_report)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
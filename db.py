@@ -1,49 +1,565 @@
+import csv  # Export ulasan ke CSV
+import gzip  # Export CSV terkompresi (.csv.gz)
+import io  # Bungkus file biner jadi teks untuk csv.writer
+import os  # Untuk membaca variabel lingkungan (lokasi DB)
+import queue  # Antrian koneksi baca yang sedang menganggur
+import re  # Validasi nilai PRAGMA dari variabel lingkungan
 import sqlite3  # Library untuk akses database SQLite
+import sys  # Estimasi ukuran objek di cache
 import threading  # Library untuk mengatur lock/thread-safe
 import time  # Library untuk delay saat retry
 import pandas as pd  # Library manipulasi data dan membaca query menjadi DataFrame
-import streamlit as st  # Library Streamlit untuk session_state/cache
+from collections import OrderedDict  # Urutan LRU untuk cache data
+from contextlib import contextmanager  # Context manager pinjam koneksi baca
+from datetime import date, timedelta  # Validasi rentang tanggal export
 from pathlib import Path  # Untuk menangani path file secara cross-platform
+from spatial import cells_covering, zonasi_cell_deg  # Sel grid zonasi per tier radius
+from registry import SchoolRegistry  # Registri sekolah di memori (lookup nama/id, typeahead)
+from timing import TracedLock, current_trace, traced  # Span per rerun + waktu tunggu lock (timing.py)
 
 # ------------------- Path dan koneksi database -------------------
-DB = Path(__file__).parent / "feedback.db"  # File database berada di folder yang sama dengan script ini
+# File database berada di folder yang sama dengan script ini (bisa diganti lewat RADAR_ZONASI_DB)
+DB = Path(os.environ.get("RADAR_ZONASI_DB") or Path(__file__).parent / "feedback.db")
 
-conn_global = sqlite3.connect(DB, timeout=30, check_same_thread=False)  # Koneksi global SQLite
-conn_global.row_factory = sqlite3.Row  # Agar hasil fetch bisa diakses seperti dictionary
-db_lock = threading.Lock()  # Lock untuk memastikan akses DB aman antar thread
+# PRAGMA koneksi; tiap nilai bisa diganti lewat RADAR_ZONASI_PRAGMA_<NAMA>, mis. RADAR_ZONASI_PRAGMA_SYNCHRONOUS=FULL
+PRAGMAS = {
+    "journal_mode": "WAL",  # Pembaca tidak memblokir penulis (dan sebaliknya)
+    "synchronous": "NORMAL",  # Aman untuk WAL; FULL jika butuh fsync tiap commit
+    "cache_size": -16000,  # Negatif = KiB (±16 MB per koneksi)
+    "mmap_size": 134217728,  # 128 MB memory-mapped I/O
+    "temp_store": "MEMORY",
+    "busy_timeout": 30000,  # ms menunggu lock sebelum "database is locked"
+}
+for _name in PRAGMAS:
+    _override = os.environ.get(f"RADAR_ZONASI_PRAGMA_{_name.upper()}")
+    if _override:
+        if not re.fullmatch(r"-?[A-Za-z0-9_]+", _override):
+            raise ValueError(f"Nilai PRAGMA {_name} tidak valid: {_override!r}")
+        PRAGMAS[_name] = _override
+
+# Maksimal koneksi baca paralel. Default = jumlah CPU, minimal 4 dan maksimal 8: SQLite melepas GIL
+# selama query berjalan, jadi beberapa pembaca tetap bisa jalan bersamaan walau hanya ada satu core.
+READ_POOL_MIN = 4
+READ_POOL_SIZE = int(os.environ.get("RADAR_ZONASI_READ_POOL") or max(READ_POOL_MIN, min(8, os.cpu_count() or 1)))
+
+def _connect(read_only=False, path=None):
+    conn = sqlite3.connect(path or DB, timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row  # Agar hasil fetch bisa diakses seperti dictionary
+    for name, value in PRAGMAS.items():
+        if read_only and name == "journal_mode":
+            continue  # Mode jurnal milik file DB, cukup diatur oleh penulis
+        conn.execute(f"PRAGMA {name} = {value}")
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")  # Pastikan koneksi baca tidak pernah menulis
+    return conn
+
+# Satu koneksi penulis; semua INSERT/UPDATE/DELETE diserialkan oleh db_lock
+conn_global = _connect()  # Koneksi global SQLite (penulis)
+db_lock = TracedLock("db_lock")  # Lock untuk memastikan hanya satu penulis sekaligus (waktu tunggu dicatat saat trace aktif)
+
+# ------------------- Pool koneksi baca -------------------
+class ReadPool:
+    """
+    Kumpulan koneksi baca yang dipakai bergantian antar thread/sesi Streamlit.
+    Dengan WAL, pembacaan berjalan paralel dan tidak menunggu db_lock.
+    """
+
+    def __init__(self, size):
+        self._idle = queue.LifoQueue()
+        self._slots = TracedLock("read_pool", threading.BoundedSemaphore(size))
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()  # Batasi jumlah koneksi baca yang aktif
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = _connect(read_only=True)
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+read_pool = ReadPool(READ_POOL_SIZE)
+
+def read_conn():
+    """Context manager: pinjam koneksi baca dari pool."""
+    return read_pool.connection()
 
 # ------------------- Inisialisasi database -------------------
 def init_db():
     with db_lock:  # Lock agar thread-safe
         c = conn_global.cursor()
-        # Membuat tabel sekolah jika belum ada
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS sekolah (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nama TEXT UNIQUE,
-                info TEXT,
-                lat REAL,
-                lon REAL,
-                akreditasi TEXT
-            )
+        try:
+            # DDL + backfill dalam satu transaksi: jika gagal, tidak ada tabel baru yang tertinggal kosong
+            c.execute("BEGIN")
+            # Membuat tabel sekolah jika belum ada
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS sekolah (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    nama TEXT UNIQUE,
+                    info TEXT,
+                    lat REAL,
+                    lon REAL,
+                    akreditasi TEXT
+                )
+            """)
+            # Membuat tabel feedback jika belum ada
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS feedback (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    sekolah_id INTEGER,
+                    opini TEXT,
+                    pos_pct REAL,
+                    vader_compound REAL,
+                    lexicon_version TEXT,
+                    minhash BLOB,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY(sekolah_id) REFERENCES sekolah(id)
+                )
+            """)
+            # Migrasi DB lama: tambahkan kolom lexicon_version jika belum ada
+            cols = [r["name"] for r in c.execute("PRAGMA table_info(feedback)")]
+            if "lexicon_version" not in cols:
+                c.execute("ALTER TABLE feedback ADD COLUMN lexicon_version TEXT")
+            # Signature MinHash opini (lihat dedup.py); NULL = belum dihitung
+            if "minhash" not in cols:
+                c.execute("ALTER TABLE feedback ADD COLUMN minhash BLOB")
+            # Checkpoint job re-scoring inkremental (per versi leksikon)
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS rescore_checkpoint (
+                    lexicon_version TEXT PRIMARY KEY,
+                    last_id INTEGER NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            # Membuat index untuk mempercepat query berdasarkan sekolah_id di feedback
+            c.execute("CREATE INDEX IF NOT EXISTS idx_feedback_sekolah ON feedback(sekolah_id)")
+            # Index komposit untuk paginasi ulasan per sekolah (keyset pada created_at, id)
+            c.execute("CREATE INDEX IF NOT EXISTS idx_feedback_sekolah_created ON feedback(sekolah_id, created_at, id)")
+            # Membuat index untuk mempercepat query berdasarkan nama sekolah
+            c.execute("CREATE INDEX IF NOT EXISTS idx_sekolah_nama ON sekolah(nama)")
+            _create_sekolah_stats(c)
+            _create_feedback_rollups(c)
+            _create_data_versions(c)
+            _create_zonasi_grid(c)
+            _create_feedback_fts(c)
+            conn_global.commit()  # Simpan perubahan
+        except sqlite3.Error:
+            conn_global.rollback()
+            raise
+
+# ------------------- Versi data per tabel (dijaga trigger) -------------------
+VERSIONED_TABLES = ("sekolah", "feedback")
+
+def _create_data_versions(c):
+    """
+    Counter versi per tabel, dinaikkan trigger pada setiap INSERT/UPDATE/DELETE.
+    Karena disimpan di DB, perubahan dari proses lain (CLI, import) juga terlihat.
+    """
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    for table in VERSIONED_TABLES:
+        c.execute("INSERT OR IGNORE INTO data_versions (name, version) VALUES (?, 0)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            c.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    UPDATE data_versions SET version = version + 1 WHERE name = '{table}';
+                END
+            """)
+
+# ------------------- Ringkasan sentimen per sekolah (dijaga trigger) -------------------
+SEKOLAH_STATS_REBUILD_SQL = """
+    INSERT INTO sekolah_stats (sekolah_id, review_count, pos_sum, vader_sum, last_review_at)
+    SELECT sekolah_id, COUNT(*), TOTAL(pos_pct), TOTAL(vader_compound), MAX(created_at)
+    FROM feedback
+    WHERE sekolah_id IS NOT NULL
+    GROUP BY sekolah_id
+"""
+
+def _create_sekolah_stats(c):
+    """
+    Tabel kecil berisi jumlah ulasan dan total skor per sekolah.
+    Trigger di tabel feedback memperbaruinya dalam transaksi yang sama dengan
+    INSERT/UPDATE/DELETE feedback, jadi peta tidak perlu membaca semua ulasan.
+    """
+    c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sekolah_stats'")
+    is_new = c.fetchone() is None
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS sekolah_stats (
+            sekolah_id INTEGER PRIMARY KEY,
+            review_count INTEGER NOT NULL DEFAULT 0,
+            pos_sum REAL NOT NULL DEFAULT 0,
+            vader_sum REAL NOT NULL DEFAULT 0,
+            last_review_at TIMESTAMP,
+            FOREIGN KEY(sekolah_id) REFERENCES sekolah(id)
+        )
+    """)
+    # Tambah kontribusi satu baris feedback (dipakai trigger INSERT dan UPDATE)
+    add_new = """
+        INSERT INTO sekolah_stats (sekolah_id, review_count, pos_sum, vader_sum, last_review_at)
+        SELECT NEW.sekolah_id, 1, COALESCE(NEW.pos_pct, 0), COALESCE(NEW.vader_compound, 0), NEW.created_at
+        WHERE NEW.sekolah_id IS NOT NULL
+        ON CONFLICT(sekolah_id) DO UPDATE SET
+            review_count = review_count + 1,
+            pos_sum = pos_sum + excluded.pos_sum,
+            vader_sum = vader_sum + excluded.vader_sum,
+            last_review_at = MAX(COALESCE(last_review_at, ''), COALESCE(excluded.last_review_at, ''));
+    """
+    remove_old = """
+        UPDATE sekolah_stats SET
+            review_count = review_count - 1,
+            pos_sum = pos_sum - COALESCE(OLD.pos_pct, 0),
+            vader_sum = vader_sum - COALESCE(OLD.vader_compound, 0)
+        WHERE sekolah_id = OLD.sekolah_id;
+    """
+    # Ulasan terbaru sekolah lama dihitung ulang dari feedback (index sekolah_id, created_at)
+    refresh_old_last = """
+        UPDATE sekolah_stats
+        SET last_review_at = (SELECT MAX(created_at) FROM feedback WHERE sekolah_id = OLD.sekolah_id)
+        WHERE sekolah_id = OLD.sekolah_id
+    """
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_stats_insert AFTER INSERT ON feedback
+        BEGIN {add_new} END
+    """)
+    # Dibuat ulang setiap init_db agar DB lama ikut memakai isi trigger terbaru
+    c.execute("DROP TRIGGER IF EXISTS trg_feedback_stats_update")
+    c.execute(f"""
+        CREATE TRIGGER trg_feedback_stats_update
+        AFTER UPDATE OF sekolah_id, pos_pct, vader_compound, created_at ON feedback
+        BEGIN
+            {remove_old}
+            {refresh_old_last}
+            AND (OLD.sekolah_id IS NOT NEW.sekolah_id OR OLD.created_at IS NOT NEW.created_at);
+            {add_new}
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_stats_delete AFTER DELETE ON feedback
+        BEGIN {remove_old} {refresh_old_last}; END
+    """)
+    if is_new:  # DB lama: isi dari feedback yang sudah ada
+        c.execute(SEKOLAH_STATS_REBUILD_SQL)
+
+def rebuild_sekolah_stats():
+    """Hitung ulang sekolah_stats dari tabel feedback (perbaikan jika ringkasan tidak sinkron)."""
+    with db_lock:
+        c = conn_global.cursor()
+        try:
+            c.execute("DELETE FROM sekolah_stats")
+            c.execute(SEKOLAH_STATS_REBUILD_SQL)
+            conn_global.commit()
+        except sqlite3.Error:
+            conn_global.rollback()  # Jangan tinggalkan tabel kosong di transaksi penulis bersama
+            raise
+        c.execute("SELECT COUNT(1) FROM sekolah_stats")
+        return c.fetchone()[0]
+
+# ------------------- Rollup sentimen harian/mingguan per sekolah (dijaga trigger) -------------------
+# Nama tabel → ekspresi bucket dari created_at (minggu = tanggal Senin, minggu ISO)
+ROLLUP_GRAINS = {
+    "day": ("feedback_daily", "date({ts})"),
+    "week": ("feedback_weekly", "date({ts}, 'weekday 0', '-6 days')"),
+}
+NEGATIVE_VADER = 0.0  # ulasan negatif: vader_compound < nilai ini (sama dengan peringatan di app)
+
+def _rollup_rebuild_sql(table, bucket):
+    return f"""
+        INSERT INTO {table} (sekolah_id, bucket, review_count, pos_sum, vader_sum, negative_count)
+        SELECT sekolah_id, {bucket.format(ts="created_at")} AS b, COUNT(*), TOTAL(pos_pct), TOTAL(vader_compound),
+               SUM(COALESCE(vader_compound, 0) < {NEGATIVE_VADER})
+        FROM feedback
+        WHERE sekolah_id IS NOT NULL AND b IS NOT NULL  -- created_at yang bukan tanggal (mis. '17/08/2023') dilewati
+        GROUP BY sekolah_id, b
+    """
+
+def _create_feedback_rollups(c):
+    """
+    feedback_daily / feedback_weekly: jumlah ulasan, total skor dan jumlah ulasan negatif
+    per sekolah per hari/minggu. Dijaga trigger seperti sekolah_stats, jadi grafik tren
+    cukup membaca beberapa ratus baris ringkasan, bukan seluruh riwayat ulasan.
+    """
+    for table, bucket in ROLLUP_GRAINS.values():
+        c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        is_new = c.fetchone() is None
+        c.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                sekolah_id INTEGER NOT NULL,
+                bucket TEXT NOT NULL,
+                review_count INTEGER NOT NULL DEFAULT 0,
+                pos_sum REAL NOT NULL DEFAULT 0,
+                vader_sum REAL NOT NULL DEFAULT 0,
+                negative_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (sekolah_id, bucket)
+            ) WITHOUT ROWID
         """)
-        # Membuat tabel feedback jika belum ada
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS feedback (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                sekolah_id INTEGER,
-                opini TEXT,
-                pos_pct REAL,
-                vader_compound REAL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY(sekolah_id) REFERENCES sekolah(id)
-            )
+        new_bucket, old_bucket = bucket.format(ts="NEW.created_at"), bucket.format(ts="OLD.created_at")
+        add_new = f"""
+            INSERT INTO {table} (sekolah_id, bucket, review_count, pos_sum, vader_sum, negative_count)
+            SELECT NEW.sekolah_id, {new_bucket}, 1, COALESCE(NEW.pos_pct, 0), COALESCE(NEW.vader_compound, 0),
+                   COALESCE(NEW.vader_compound, 0) < {NEGATIVE_VADER}
+            WHERE NEW.sekolah_id IS NOT NULL AND {new_bucket} IS NOT NULL
+            ON CONFLICT(sekolah_id, bucket) DO UPDATE SET
+                review_count = review_count + 1,
+                pos_sum = pos_sum + excluded.pos_sum,
+                vader_sum = vader_sum + excluded.vader_sum,
+                negative_count = negative_count + excluded.negative_count;
+        """
+        remove_old = f"""
+            UPDATE {table} SET
+                review_count = review_count - 1,
+                pos_sum = pos_sum - COALESCE(OLD.pos_pct, 0),
+                vader_sum = vader_sum - COALESCE(OLD.vader_compound, 0),
+                negative_count = negative_count - (COALESCE(OLD.vader_compound, 0) < {NEGATIVE_VADER})
+            WHERE sekolah_id = OLD.sekolah_id AND bucket = {old_bucket};
+            DELETE FROM {table} WHERE sekolah_id = OLD.sekolah_id AND bucket = {old_bucket} AND review_count <= 0;
+        """
+        # Dibuat ulang setiap init_db agar DB lama ikut memakai isi trigger terbaru
+        for event in ("insert", "update", "delete"):
+            c.execute(f"DROP TRIGGER IF EXISTS trg_{table}_{event}")
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_insert AFTER INSERT ON feedback
+            BEGIN {add_new} END
+        """)
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_update
+            AFTER UPDATE OF sekolah_id, pos_pct, vader_compound, created_at ON feedback
+            BEGIN {remove_old} {add_new} END
+        """)
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_delete AFTER DELETE ON feedback
+            BEGIN {remove_old} END
         """)
-        # Membuat index untuk mempercepat query berdasarkan sekolah_id di feedback
-        c.execute("CREATE INDEX IF NOT EXISTS idx_feedback_sekolah ON feedback(sekolah_id)")
-        # Membuat index untuk mempercepat query berdasarkan nama sekolah
-        c.execute("CREATE INDEX IF NOT EXISTS idx_sekolah_nama ON sekolah(nama)")
-        conn_global.commit()  # Simpan perubahan
+        if is_new:  # DB lama: isi dari riwayat feedback
+            c.execute(_rollup_rebuild_sql(table, bucket))
+
+def rebuild_feedback_rollups():
+    """Hitung ulang semua rollup dari tabel feedback. Kembalikan {grain: jumlah baris rollup}."""
+    counts = {}
+    with db_lock:
+        c = conn_global.cursor()
+        try:
+            for grain, (table, bucket) in ROLLUP_GRAINS.items():
+                c.execute(f"DELETE FROM {table}")
+                c.execute(_rollup_rebuild_sql(table, bucket))
+                counts[grain] = c.execute(f"SELECT COUNT(1) FROM {table}").fetchone()[0]
+            conn_global.commit()
+        except sqlite3.Error:
+            conn_global.rollback()
+            raise
+    return counts
+
+# ------------------- Full-text search ulasan (FTS5, dijaga trigger) -------------------
+def _create_feedback_fts(c):
+    """
+    feedback_fts: index FTS5 atas feedback.opini (external content, teks tidak disalin).
+    Trigger menjaga index dalam transaksi yang sama dengan INSERT/UPDATE/DELETE feedback.
+    """
+    c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'feedback_fts'")
+    is_new = c.fetchone() is None
+    c.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS feedback_fts USING fts5(
+            opini,
+            content = 'feedback',
+            content_rowid = 'id',
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_fts_insert AFTER INSERT ON feedback
+        BEGIN
+            INSERT INTO feedback_fts (rowid, opini) VALUES (NEW.id, NEW.opini);
+        END
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_fts_update AFTER UPDATE OF opini ON feedback
+        BEGIN
+            INSERT INTO feedback_fts (feedback_fts, rowid, opini) VALUES ('delete', OLD.id, OLD.opini);
+            INSERT INTO feedback_fts (rowid, opini) VALUES (NEW.id, NEW.opini);
+        END
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_fts_delete AFTER DELETE ON feedback
+        BEGIN
+            INSERT INTO feedback_fts (feedback_fts, rowid, opini) VALUES ('delete', OLD.id, OLD.opini);
+        END
+    """)
+    if is_new:  # DB lama: index ulasan yang sudah ada
+        c.execute("INSERT INTO feedback_fts (feedback_fts) VALUES ('rebuild')")
+
+def rebuild_feedback_fts():
+    """Bangun ulang index FTS dari tabel feedback lalu gabungkan segmennya (optimize)."""
+    with db_lock:
+        c = conn_global.cursor()
+        try:
+            c.execute("INSERT INTO feedback_fts (feedback_fts) VALUES ('rebuild')")
+            c.execute("INSERT INTO feedback_fts (feedback_fts) VALUES ('optimize')")
+            conn_global.commit()
+        except sqlite3.Error:
+            conn_global.rollback()
+            raise
+        c.execute("SELECT COUNT(1) FROM feedback")
+        return c.fetchone()[0]
+
+def fts_query(text):
+    """
+    Ubah input pengguna jadi query FTS5 yang aman: setiap kata dikutip (AND implisit),
+    kata berakhiran * menjadi pencarian awalan. Kembalikan None jika tidak ada kata.
+    """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    return " ".join(terms) or None
+
+# ------------------- Grid zonasi (kandidat sekolah per sel dan tier radius) -------------------
+# Tier radius (meter) yang dihitung di muka; query radius r memakai tier terkecil >= r
+ZONASI_TIERS = (500, 1000, 2000, 5000, 10000)
+
+def _create_zonasi_grid(c):
+    """
+    zonasi_grid: untuk setiap tier, sel grid (ci, cj) berukuran ±tier meter dan
+    sekolah yang jaraknya ke sel itu <= tier. Sekolah yang koordinatnya baru/berubah
+    dicatat trigger di zonasi_dirty, lalu dihitung ulang oleh refresh_zonasi_grid().
+    """
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS zonasi_grid (
+            tier INTEGER NOT NULL,
+            ci INTEGER NOT NULL,
+            cj INTEGER NOT NULL,
+            sekolah_id INTEGER NOT NULL,
+            PRIMARY KEY (tier, ci, cj, sekolah_id)
+        ) WITHOUT ROWID
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_zonasi_grid_sekolah ON zonasi_grid(sekolah_id)")
+    c.execute("CREATE TABLE IF NOT EXISTS zonasi_dirty (sekolah_id INTEGER PRIMARY KEY)")
+    c.execute("INSERT OR IGNORE INTO data_versions (name, version) VALUES ('zonasi_grid', 0)")
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_sekolah_zonasi_insert AFTER INSERT ON sekolah
+        BEGIN
+            INSERT OR IGNORE INTO zonasi_dirty (sekolah_id) VALUES (NEW.id);
+        END
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_sekolah_zonasi_update AFTER UPDATE OF lat, lon ON sekolah
+        WHEN NEW.lat IS NOT OLD.lat OR NEW.lon IS NOT OLD.lon
+        BEGIN
+            INSERT OR IGNORE INTO zonasi_dirty (sekolah_id) VALUES (NEW.id);
+        END
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_sekolah_zonasi_delete AFTER DELETE ON sekolah
+        BEGIN
+            DELETE FROM zonasi_grid WHERE sekolah_id = OLD.id;
+            DELETE FROM zonasi_dirty WHERE sekolah_id = OLD.id;
+        END
+    """)
+    # DB lama atau ZONASI_TIERS berubah: tandai semua sekolah untuk dihitung ulang
+    tiers = {r[0] for r in c.execute("SELECT DISTINCT tier FROM zonasi_grid")}
+    if tiers != set(ZONASI_TIERS):
+        c.execute("DELETE FROM zonasi_grid")
+        c.execute("INSERT OR IGNORE INTO zonasi_dirty (sekolah_id) SELECT id FROM sekolah")
+
+def refresh_zonasi_grid(batch_size=1000):
+    """
+    Hitung ulang sel grid untuk sekolah di zonasi_dirty, per batch dalam satu transaksi.
+    Kembalikan jumlah sekolah yang diproses.
+    """
+    done = 0
+    while True:
+        with db_lock:
+            c = conn_global.cursor()
+            c.execute(
+                """
+                SELECT d.sekolah_id, s.lat, s.lon FROM zonasi_dirty d
+                LEFT JOIN sekolah s ON s.id = d.sekolah_id
+                ORDER BY d.sekolah_id LIMIT ?
+                """,
+                (batch_size,)
+            )
+            rows = c.fetchall()
+            if not rows:
+                return done
+            ids = [r[0] for r in rows]
+            located = [r for r in rows if r[1] is not None and r[2] is not None]
+            try:
+                c.executemany("DELETE FROM zonasi_grid WHERE sekolah_id = ?", [(i,) for i in ids])
+                for tier in ZONASI_TIERS:
+                    idx, ci, cj = cells_covering(
+                        [r[1] for r in located], [r[2] for r in located], tier, zonasi_cell_deg(tier)
+                    )
+                    c.executemany(
+                        "INSERT OR IGNORE INTO zonasi_grid (tier, ci, cj, sekolah_id) VALUES (?, ?, ?, ?)",
+                        ((tier, i, j, located[k][0]) for k, i, j in zip(idx.tolist(), ci.tolist(), cj.tolist()))
+                    )
+                c.executemany("DELETE FROM zonasi_dirty WHERE sekolah_id = ?", [(i,) for i in ids])
+                c.execute("UPDATE data_versions SET version = version + 1 WHERE name = 'zonasi_grid'")
+                conn_global.commit()
+            except sqlite3.Error:
+                conn_global.rollback()
+                raise
+        done += len(rows)
+
+def rebuild_zonasi_grid():
+    """Tandai semua sekolah lalu hitung ulang seluruh grid zonasi."""
+    with db_lock:
+        c = conn_global.cursor()
+        try:
+            c.execute("DELETE FROM zonasi_grid")
+            c.execute("INSERT OR IGNORE INTO zonasi_dirty (sekolah_id) SELECT id FROM sekolah")
+            conn_global.commit()
+        except sqlite3.Error:
+            conn_global.rollback()  # Grid lama tetap utuh jika penandaan gagal
+            raise
+    return refresh_zonasi_grid()
+
+@traced()
+def load_zonasi_candidates(tier, ci, cj):
+    """Sekolah (id, nama, lat, lon) yang mungkin berada dalam radius tier dari titik di sel (ci, cj)."""
+    with read_conn() as conn:
+        return conn.execute(
+            """
+            SELECT s.id, s.nama, s.lat, s.lon FROM zonasi_grid g
+            JOIN sekolah s ON s.id = g.sekolah_id
+            WHERE g.tier = ? AND g.ci = ? AND g.cj = ?
+            """,
+            (tier, ci, cj)
+        ).fetchall()
+
+# Offset agar pembagian bulat di SQLite (terpotong ke nol) berlaku seperti floor untuk indeks negatif
+_ZONASI_CELL_OFFSET = 1 << 24
+
+@traced()
+def load_zonasi_coverage(tier, ci0, ci1, cj0, cj1, k=1):
+    """
+    Jumlah pasangan (sel, sekolah) pada tier tsb di sel [ci0..ci1] x [cj0..cj1],
+    dikelompokkan per blok k x k sel (k pangkat dua). Kembalikan list (bi, bj, jumlah);
+    blok (bi, bj) mencakup sel bi*k .. bi*k+k-1.
+    """
+    off = _ZONASI_CELL_OFFSET
+    with read_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT (ci + ?) / ? AS bi, (cj + ?) / ? AS bj, COUNT(*) FROM zonasi_grid
+            WHERE tier = ? AND ci BETWEEN ? AND ? AND cj BETWEEN ? AND ?
+            GROUP BY bi, bj
+            """,
+            (off, k, off, k, tier, ci0, ci1, cj0, cj1)
+        ).fetchall()
+    return [(bi - off // k, bj - off // k, n) for bi, bj, n in rows]
 
 # ------------------- Insert sample data sekolah jika tabel kosong -------------------
 def insert_sample_sekolah_if_empty():
@@ -93,19 +609,23 @@ def insert_sample_sekolah_if_empty():
             conn_global.commit()  # Simpan ke DB
 
 # ------------------- Insert atau update sekolah (bisa kapan saja) -------------------
-def insert_or_update_sekolah(sekolah_list):
+def insert_or_update_sekolah(sekolah_list, refresh_zonasi=True):
     """
     Fungsi untuk menambahkan daftar sekolah baru atau update jika sudah ada.
     sekolah_list: list of tuples (nama, info, lat, lon, akreditasi)
+    Semua baris ditulis dengan satu executemany dalam satu transaksi;
+    untuk sumber besar panggil per chunk (lihat importer.py).
+    refresh_zonasi: hitung ulang grid zonasi untuk sekolah yang koordinatnya berubah
+    (False → ditunda, panggil refresh_zonasi_grid() sendiri setelah semua chunk).
     """
     if not sekolah_list:
         return  # Jika list kosong, langsung keluar
 
     with db_lock:  # Pastikan thread-safe
         c = conn_global.cursor()
-        for s in sekolah_list:
-            # INSERT OR REPLACE → jika nama sekolah sudah ada, update data lain
-            c.execute(
+        try:
+            # Upsert → jika nama sekolah sudah ada, update data lain
+            c.executemany(
                 """
                 INSERT INTO sekolah (nama, info, lat, lon, akreditasi)
                 VALUES (?, ?, ?, ?, ?)
@@ -115,64 +635,579 @@ def insert_or_update_sekolah(sekolah_list):
                     lon=excluded.lon,
                     akreditasi=excluded.akreditasi
                 """,
-                s
+                sekolah_list
             )
-        conn_global.commit()  # Simpan ke DB
-
-    # Reset cache supaya data terbaru langsung tampil
-    st.session_state["sekolah_cache"] = None
+            conn_global.commit()  # Simpan ke DB
+        except sqlite3.Error:
+            conn_global.rollback()
+            raise
 
+    if refresh_zonasi:
+        refresh_zonasi_grid()
 
+    # Cache tidak perlu di-reset: trigger menaikkan versi tabel sekolah
 
 # ------------------- Ambil ID sekolah berdasarkan nama -------------------
+def get_sekolah_ids_by_nama(names):
+    """Kembalikan dict nama → id untuk nama yang ada di tabel sekolah."""
+    names = list(set(names))
+    found = {}
+    with read_conn() as conn:
+        c = conn.cursor()
+        # Batasi jumlah parameter per query (batas variabel SQLite)
+        for i in range(0, len(names), 500):
+            part = names[i:i + 500]
+            c.execute(
+                f"SELECT id, nama FROM sekolah WHERE nama IN ({','.join('?' * len(part))})",
+                part
+            )
+            found.update((row["nama"], row["id"]) for row in c.fetchall())
+    return found
+
+@traced()
 def get_sekolah_id_by_nama(nama):
-    with db_lock:
-        c = conn_global.cursor()
+    with read_conn() as conn:
+        c = conn.cursor()
         c.execute("SELECT id FROM sekolah WHERE nama = ?", (nama,))
         row = c.fetchone()
         return row["id"] if row else None  # Kembalikan None jika tidak ada
 
+# ------------------- Cache data bersama antar sesi (per proses) -------------------
+CACHE_MAX_BYTES = int(float(os.environ.get("RADAR_ZONASI_CACHE_MB", "256")) * 1024 * 1024)
+
+class DataCache:
+    """
+    Cache LRU per proses untuk DataFrame/objek turunan tabel, dipakai bersama semua sesi.
+    Setiap entri disimpan bersama versi tabel sumbernya; jika versi berubah, entri dimuat ulang.
+    Total ukuran dibatasi max_bytes (entri paling lama tidak dipakai dibuang lebih dulu).
+    Objek yang dikembalikan dipakai bersama: jangan diubah di tempat.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (versi, objek, ukuran)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _sizeof(obj):
+        if hasattr(obj, "memory_usage"):  # DataFrame
+            return int(obj.memory_usage(deep=True).sum())
+        if hasattr(obj, "nbytes"):
+            return int(obj.nbytes)
+        return sys.getsizeof(obj)
+
+    def get(self, key, version, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            key_lock = self._key_locks.setdefault(key, TracedLock("data_cache", threading.Lock()))
+        # Satu loader per key: sesi lain menunggu hasil yang sama, tidak ikut query
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self.misses += 1
+            obj = loader()
+            size = self._sizeof(obj)
+            with self._lock:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self.total_bytes -= old[2]
+                self._entries[key] = (version, obj, size)
+                self.total_bytes += size
+                while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                    _, (_, _, evicted) = self._entries.popitem(last=False)
+                    self.total_bytes -= evicted
+                    self.evictions += 1
+            return obj
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+data_cache = DataCache(CACHE_MAX_BYTES)
+
+# Koneksi khusus untuk cek versi: PRAGMA data_version di koneksi ini berubah
+# setiap kali koneksi lain (penulis app, CLI, proses lain) melakukan commit.
+_version_conn = None
+_version_lock = threading.Lock()
+_version_state = {"data_version": None, "tables": {}}
+
+def table_versions(tables=VERSIONED_TABLES):
+    """Versi tabel saat ini sebagai tuple; hanya membaca data_versions jika DB berubah."""
+    global _version_conn
+    with _version_lock:
+        if _version_conn is None:
+            _version_conn = _connect(read_only=True)
+        dv = _version_conn.execute("PRAGMA data_version").fetchone()[0]
+        if dv != _version_state["data_version"]:
+            try:
+                rows = _version_conn.execute("SELECT name, version FROM data_versions").fetchall()
+            except sqlite3.OperationalError:  # init_db belum dijalankan
+                rows = []
+            _version_state["tables"] = {r["name"]: r["version"] for r in rows}
+            _version_state["data_version"] = dv
+        return tuple(_version_state["tables"].get(t, 0) for t in tables)
+
+def cached(key, tables, loader):
+    """Ambil objek dari data_cache; dimuat ulang dengan loader() jika versi salah satu tabel berubah."""
+    if current_trace() is not None:
+        loader = traced(f"load:{key}")(loader)  # Span hanya muncul saat cache miss
+    return data_cache.get(key, table_versions(tables), loader)
+
 # ------------------- Load DataFrame sekolah dengan cache -------------------
+@traced()
 def load_sekolah_df():
-    if st.session_state.get("sekolah_cache") is not None:  # Pakai cache dulu
-        return st.session_state["sekolah_cache"]
-    df = safe_read("SELECT * FROM sekolah")  # Baca DB
-    st.session_state["sekolah_cache"] = df  # Simpan cache
-    return df
+    # Satu salinan per proses, dipakai bersama semua sesi
+    return cached("sekolah_df", ("sekolah",), lambda: safe_read("SELECT * FROM sekolah"))
+
+# ------------------- Registri sekolah (nama/id/koordinat, typeahead) dengan cache -------------------
+@traced(rows=False)
+def load_sekolah_registry():
+    """SchoolRegistry sejajar dengan load_sekolah_df(); dibangun ulang hanya jika tabel sekolah berubah."""
+    return cached("sekolah_registry", ("sekolah",), lambda: SchoolRegistry.from_df(load_sekolah_df()))
 
 # ------------------- Load DataFrame feedback dengan cache -------------------
+@traced()
 def load_feedback_df():
-    if st.session_state.get("feedback_cache") is not None:  # Pakai cache dulu
-        return st.session_state["feedback_cache"]
-    df = safe_read("""
+    return cached("feedback_df", ("feedback", "sekolah"), lambda: safe_read("""
         SELECT f.*, s.nama AS sekolah, s.akreditasi
         FROM feedback f
         JOIN sekolah s ON f.sekolah_id = s.id
         ORDER BY f.created_at DESC
+    """))
+
+# ------------------- Load ulasan satu sekolah per halaman (keyset pagination) -------------------
+@traced()
+def load_feedback_page(sekolah_id, limit=20, cursor=None):
+    """
+    Ambil ulasan terbaru satu sekolah, maksimal `limit` baris.
+    cursor: (created_at, id) dari baris terakhir halaman sebelumnya, atau None untuk halaman pertama.
+    Kembalikan (DataFrame, cursor_berikutnya); cursor_berikutnya None jika sudah habis.
+    """
+    if cursor is None:
+        df = safe_read(
+            """
+            SELECT id, opini, pos_pct, vader_compound, created_at FROM feedback
+            WHERE sekolah_id = ?
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+            """,
+            (sekolah_id, limit + 1)
+        )
+    else:
+        df = safe_read(
+            """
+            SELECT id, opini, pos_pct, vader_compound, created_at FROM feedback
+            WHERE sekolah_id = ? AND (created_at, id) < (?, ?)
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+            """,
+            (sekolah_id, cursor[0], cursor[1], limit + 1)
+        )
+    if len(df) <= limit:
+        return df, None
+    df = df.iloc[:limit]
+    last = df.iloc[-1]
+    return df, (last["created_at"], int(last["id"]))
+
+# ------------------- Export ulasan bertahap (CSV / Parquet) -------------------
+EXPORT_COLUMNS = ("id", "sekolah_id", "sekolah", "akreditasi", "opini", "pos_pct", "vader_compound",
+                  "lexicon_version", "created_at")
+EXPORT_CHUNK_SIZE = 10000  # baris per fetchmany (= satu row group Parquet)
+
+def iter_feedback_export(sekolah_id=None, start=None, end=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Generator: baris ulasan (tuple sesuai EXPORT_COLUMNS) per chunk, urut id (keyset
+    id > terakhir, tanpa sort di memori). Filter opsional: satu sekolah dan/atau rentang
+    tanggal start..end (YYYY-MM-DD, inklusif). Koneksi baca dipinjam per chunk saja,
+    seperti iter_feedback_chunks, jadi export besar tidak menahan pool untuk sesi lain.
+    """
+    where, params = ["f.id > ?"], []
+    if sekolah_id is not None:
+        where.append("f.sekolah_id = ?")
+        params.append(sekolah_id)
+    # date(?) di SQLite memberi NULL (0 baris, tanpa error) untuk '2024-1-1' → validasi di sini
+    if start:
+        where.append("f.created_at >= ?")
+        params.append(date.fromisoformat(str(start)).isoformat())
+    if end:
+        where.append("f.created_at < ?")
+        params.append((date.fromisoformat(str(end)) + timedelta(days=1)).isoformat())
+    query = f"""
+        SELECT f.id, f.sekolah_id, s.nama, s.akreditasi, f.opini, f.pos_pct, f.vader_compound,
+               f.lexicon_version, f.created_at
+        FROM feedback f
+        LEFT JOIN sekolah s ON f.sekolah_id = s.id
+        WHERE {" AND ".join(where)}
+        ORDER BY f.id
+        LIMIT ?
+    """
+    last_id = 0
+    while True:
+        with read_conn() as conn:
+            rows = [tuple(r) for r in conn.execute(query, [last_id, *params, chunk_size])]
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+def _write_csv(out, chunks, progress=None):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    try:
+        writer = csv.writer(text)
+        writer.writerow(EXPORT_COLUMNS)
+        total = 0
+        for rows in chunks:
+            writer.writerows(rows)
+            total += len(rows)
+            if progress:
+                progress(total)
+        text.flush()
+        return total
+    finally:
+        text.detach()  # Jangan tutup file milik pemanggil
+
+def _write_parquet(out, chunks, progress=None):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Export Parquet membutuhkan pyarrow (pip install pyarrow)") from None
+    schema = pa.schema([
+        ("id", pa.int64()), ("sekolah_id", pa.int64()), ("sekolah", pa.string()), ("akreditasi", pa.string()),
+        ("opini", pa.string()), ("pos_pct", pa.float64()), ("vader_compound", pa.float64()),
+        ("lexicon_version", pa.string()), ("created_at", pa.string()),
+    ])
+    total = 0
+    with pq.ParquetWriter(out, schema, compression="zstd") as writer:
+        for rows in chunks:
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema
+            ))
+            total += len(rows)
+            if progress:
+                progress(total)
+    return total
+
+EXPORT_FORMATS = {"csv": _write_csv, "parquet": _write_parquet}
+
+@traced()
+def export_feedback(out, fmt="csv", sekolah_id=None, start=None, end=None,
+                    chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """
+    Tulis ulasan ke out (path atau file biner) sebagai CSV / Parquet, per chunk,
+    sehingga memori tetap datar berapa pun jumlah barisnya. Path berakhiran .gz → CSV gzip.
+    Path ditulis ke file sementara lalu di-rename (dump terjadwal tidak pernah setengah jadi).
+    Kembalikan jumlah baris.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format export tidak dikenal: {fmt!r} (pilih {', '.join(EXPORT_FORMATS)})")
+    write = EXPORT_FORMATS[fmt]
+    chunks = iter_feedback_export(sekolah_id, start, end, chunk_size)
+    if not isinstance(out, (str, os.PathLike)):
+        return write(out, chunks, progress)
+    path = Path(out)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        opener = gzip.open if fmt == "csv" and path.suffix == ".gz" else open
+        with opener(tmp, "wb") as f:
+            total = write(f, chunks, progress)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return total
+
+# ------------------- Cari ulasan (full-text, diurutkan relevansi) -------------------
+@traced()
+def search_feedback(query, sekolah_id=None, limit=20, offset=0):
+    """
+    Cari ulasan yang memuat semua kata di query (lihat fts_query), diurutkan bm25.
+    sekolah_id: batasi ke satu sekolah (None = semua sekolah).
+    Kolom cuplikan berisi potongan opini dengan kata yang cocok ditebalkan (**kata**).
+    """
+    match = fts_query(query or "")
+    if match is None:
+        return pd.DataFrame(columns=["id", "sekolah_id", "sekolah", "opini", "pos_pct", "created_at", "cuplikan"])
+    school_filter = "AND f.sekolah_id = ?" if sekolah_id is not None else ""
+    params = [match] + ([sekolah_id] if sekolah_id is not None else []) + [limit, offset]
+    return safe_read(
+        f"""
+        SELECT f.id, f.sekolah_id, s.nama AS sekolah, f.opini, f.pos_pct, f.created_at,
+               snippet(feedback_fts, 0, '**', '**', '…', 16) AS cuplikan
+        FROM feedback_fts
+        JOIN feedback f ON f.id = feedback_fts.rowid
+        LEFT JOIN sekolah s ON s.id = f.sekolah_id
+        WHERE feedback_fts MATCH ? {school_filter}
+        ORDER BY feedback_fts.rank
+        LIMIT ? OFFSET ?
+        """,
+        params
+    )
+
+# ------------------- Load tren sentimen dari rollup -------------------
+@traced()
+def load_sentiment_trend(sekolah_id=None, grain="week", periods=None):
+    """
+    Tren per bucket (hari / minggu) dari tabel rollup, bukan dari tabel feedback.
+    sekolah_id None → gabungan semua sekolah. periods: hanya N bucket terakhir
+    (dihitung dari bucket terbaru yang ada, jadi arsip lama tetap tampil).
+    Kolom: bucket, review_count, pos_pct, vader_compound (rata-rata), negative_count.
+    """
+    table, _ = ROLLUP_GRAINS[grain]
+    where, params = ("WHERE sekolah_id = ?", [sekolah_id]) if sekolah_id is not None else ("", [])
+    if periods:
+        days = int(periods) * (1 if grain == "day" else 7)
+        latest = f"SELECT MAX(bucket) FROM {table} {where}"
+        where += (" AND " if where else "WHERE ") + f"bucket > date(({latest}), '-{days} days')"
+        params = params * 2
+    return safe_read(f"""
+        SELECT bucket,
+               SUM(review_count) AS review_count,
+               SUM(pos_sum) / SUM(review_count) AS pos_pct,
+               SUM(vader_sum) / SUM(review_count) AS vader_compound,
+               SUM(negative_count) AS negative_count
+        FROM {table}
+        {where}
+        GROUP BY bucket
+        ORDER BY bucket
+    """, params)
+
+# ------------------- Load ringkasan sentimen per sekolah (untuk peta) -------------------
+@traced()
+def load_sekolah_stats_df():
+    # Tabel kecil (satu baris per sekolah yang punya ulasan), tidak perlu cache
+    return safe_read("""
+        SELECT s.nama AS sekolah, st.sekolah_id, st.review_count,
+               st.pos_sum / st.review_count AS pos_pct,
+               st.vader_sum / st.review_count AS vader_compound,
+               st.last_review_at
+        FROM sekolah_stats st
+        JOIN sekolah s ON st.sekolah_id = s.id
+        WHERE st.review_count > 0
     """)
-    st.session_state["feedback_cache"] = df  # Simpan cache
-    return df
 
 # ------------------- Simpan feedback baru ke DB -------------------
-def save_feedback(sekolah_id, opini, pos_pct, vader_compound):
+@traced()
+def save_feedback(sekolah_id, opini, pos_pct, vader_compound, lexicon_version=None, minhash=None):
     with db_lock:
         c = conn_global.cursor()
         c.execute(
-            "INSERT INTO feedback (sekolah_id, opini, pos_pct, vader_compound) VALUES (?, ?, ?, ?)",
-            (sekolah_id, opini, pos_pct, vader_compound)
+            """
+            INSERT INTO feedback (sekolah_id, opini, pos_pct, vader_compound, lexicon_version, minhash)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (sekolah_id, opini, pos_pct, vader_compound, lexicon_version, minhash)
         )
         conn_global.commit()
-    st.session_state["feedback_cache"] = None  # Reset cache agar load ulang
+
+# ------------------- Simpan banyak feedback dalam satu transaksi -------------------
+def save_feedback_many(rows):
+    """
+    rows: list of tuples (sekolah_id, opini, pos_pct, vader_compound, lexicon_version, minhash)
+    Satu executemany + satu commit (group commit) untuk semua baris.
+    """
+    if not rows:
+        return
+    with db_lock:
+        c = conn_global.cursor()
+        try:
+            c.executemany(
+                """
+                INSERT INTO feedback (sekolah_id, opini, pos_pct, vader_compound, lexicon_version, minhash)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+            conn_global.commit()
+        except sqlite3.Error:
+            conn_global.rollback()  # Jangan tinggalkan transaksi setengah jadi di koneksi penulis
+            raise
+
+def import_feedback_many(rows):
+    """
+    Tulis feedback hasil impor (arsip ulasan) dalam satu transaksi.
+    rows: list of tuples (sekolah_id, opini, pos_pct, vader_compound, lexicon_version, created_at, minhash);
+    created_at None → waktu sekarang.
+    """
+    if not rows:
+        return
+    with db_lock:
+        c = conn_global.cursor()
+        try:
+            c.executemany(
+                """
+                INSERT INTO feedback (sekolah_id, opini, pos_pct, vader_compound, lexicon_version, created_at, minhash)
+                VALUES (?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?)
+                """,
+                rows
+            )
+            conn_global.commit()
+        except sqlite3.Error:
+            conn_global.rollback()
+            raise
+
+# ------------------- Streaming feedback per chunk (untuk re-scoring massal) -------------------
+def iter_feedback_chunks(chunk_size=1000, start_after_id=0):
+    """
+    Generator: ambil feedback (id, opini) per chunk berdasarkan id (keyset),
+    sehingga tabel besar tidak pernah dimuat seluruhnya ke memori.
+    """
+    last_id = start_after_id
+    while True:
+        with read_conn() as conn:
+            c = conn.cursor()
+            c.execute(
+                "SELECT id, opini FROM feedback WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, chunk_size)
+            )
+            rows = [(r["id"], r["opini"]) for r in c.fetchall()]
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+# ------------------- Streaming feedback yang skornya usang -------------------
+def fetch_stale_feedback(lexicon_version, after_id, chunk_size=500):
+    """Ambil maksimal chunk_size baris (id, opini) dengan id > after_id yang versi leksikonnya berbeda."""
+    with read_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            """
+            SELECT id, opini FROM feedback
+            WHERE id > ? AND (lexicon_version IS NULL OR lexicon_version != ?)
+            ORDER BY id LIMIT ?
+            """,
+            (after_id, lexicon_version, chunk_size)
+        )
+        return [(r["id"], r["opini"]) for r in c.fetchall()]
+
+# ------------------- Signature MinHash (deteksi ulasan hampir sama) -------------------
+def iter_minhash_chunks(chunk_size=10000, after_id=0, with_text=False):
+    """
+    Generator: baris feedback yang sudah punya minhash, per chunk (keyset pada id).
+    Setiap baris: (id, sekolah_id, minhash) atau (id, sekolah_id, minhash, opini) jika with_text.
+    """
+    cols = "id, sekolah_id, minhash, opini" if with_text else "id, sekolah_id, minhash"
+    while True:
+        with read_conn() as conn:
+            rows = [tuple(r) for r in conn.execute(
+                f"SELECT {cols} FROM feedback WHERE id > ? AND minhash IS NOT NULL ORDER BY id LIMIT ?",
+                (after_id, chunk_size)
+            )]
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1][0]
+
+def fetch_feedback_minhash(ids):
+    """Baris (id, sekolah_id, minhash, opini) untuk id yang diminta."""
+    ids = list(ids)
+    rows = []
+    with read_conn() as conn:
+        for i in range(0, len(ids), 500):
+            part = ids[i:i + 500]
+            rows.extend(tuple(r) for r in conn.execute(
+                f"SELECT id, sekolah_id, minhash, opini FROM feedback WHERE id IN ({','.join('?' * len(part))})",
+                part
+            ))
+    return rows
+
+def fetch_feedback_without_minhash(after_id, chunk_size=2000):
+    """Ambil maksimal chunk_size baris (id, opini) dengan id > after_id yang belum punya minhash."""
+    with read_conn() as conn:
+        return [tuple(r) for r in conn.execute(
+            "SELECT id, opini FROM feedback WHERE id > ? AND minhash IS NULL ORDER BY id LIMIT ?",
+            (after_id, chunk_size)
+        )]
+
+def update_feedback_minhash(rows):
+    """rows: list of tuples (minhash, id), ditulis dalam satu transaksi."""
+    if not rows:
+        return
+    with db_lock:
+        c = conn_global.cursor()
+        try:
+            c.executemany("UPDATE feedback SET minhash = ? WHERE id = ?", rows)
+            conn_global.commit()
+        except sqlite3.Error:
+            conn_global.rollback()
+            raise
+
+# ------------------- Checkpoint re-scoring -------------------
+def get_rescore_checkpoint(lexicon_version):
+    with read_conn() as conn:
+        c = conn.cursor()
+        c.execute("SELECT last_id FROM rescore_checkpoint WHERE lexicon_version = ?", (lexicon_version,))
+        row = c.fetchone()
+        return row["last_id"] if row else 0
+
+def reset_rescore_checkpoint(lexicon_version):
+    with db_lock:
+        conn_global.execute("DELETE FROM rescore_checkpoint WHERE lexicon_version = ?", (lexicon_version,))
+        conn_global.commit()
+
+# ------------------- Update skor feedback per chunk -------------------
+def update_feedback_scores(rows, checkpoint=None):
+    """
+    rows: list of tuples (pos_pct, vader_compound, lexicon_version, id)
+    checkpoint: tuple opsional (lexicon_version, last_id) yang disimpan
+    dalam transaksi yang sama, supaya job bisa dilanjutkan setelah berhenti.
+    Satu executemany + satu commit per chunk.
+    """
+    if not rows:
+        return
+    with db_lock:
+        c = conn_global.cursor()
+        try:
+            c.executemany(
+                "UPDATE feedback SET pos_pct = ?, vader_compound = ?, lexicon_version = ? WHERE id = ?",
+                rows
+            )
+            if checkpoint:
+                c.execute(
+                    """
+                    INSERT INTO rescore_checkpoint (lexicon_version, last_id, updated_at)
+                    VALUES (?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(lexicon_version) DO UPDATE SET
+                        last_id=excluded.last_id,
+                        updated_at=excluded.updated_at
+                    """,
+                    checkpoint
+                )
+            conn_global.commit()
+        except sqlite3.Error:
+            conn_global.rollback()  # Chunk + checkpoint batal bersama; commit penulis lain tidak ikut menyimpannya
+            raise
 
 # ------------------- Fungsi membaca query DB aman (retry jika terkunci) -------------------
 def safe_read(query, params=None, max_retries=6):
     attempt = 0
     while attempt < max_retries:
         try:
-            with db_lock:
+            with read_conn() as conn:  # Tidak memakai db_lock: pembaca berjalan paralel
                 if params:
-                    return pd.read_sql_query(query, conn_global, params=params)
-                return pd.read_sql_query(query, conn_global)
+                    return pd.read_sql_query(query, conn, params=params)
+                return pd.read_sql_query(query, conn)
         except sqlite3.OperationalError as e:
             if "locked" in str(e).lower():  # Jika DB terkunci
                 attempt += 1
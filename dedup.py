@@ -0,0 +1,276 @@
+import threading
+import time
+import zlib
+import numpy as np
+from db import (
+    fetch_feedback_minhash,
+    fetch_feedback_without_minhash,
+    iter_minhash_chunks,
+    update_feedback_minhash,
+)
+from sentiment import clean_text
+
+NUM_PERM = 64                      # panjang signature
+LSH_BANDS = 16                     # 16 band x 4 baris: kandidat mulai ±Jaccard 0.5
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_SIZE = 2                   # shingle = 2 kata berurutan dari clean_text
+DUP_THRESHOLD = 0.8                # estimasi Jaccard minimum untuk dianggap hampir sama
+MIN_WORDS = 3                      # ulasan sangat pendek ("sekolah bagus") wajar mirip, tidak dicek
+MAX_CANDIDATES_PER_BAND = 500      # batasi bucket raksasa (ulasan kembar ribuan kali)
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MASK32 = np.uint64(0xFFFFFFFF)
+_BAND_MIX = np.uint64(0x9E3779B97F4A7C15)
+# Seed tetap: signature yang tersimpan di DB harus sama di semua proses
+_perm_rng = np.random.RandomState(20240601)
+_A = _perm_rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_B = _perm_rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+# ------------------- Signature MinHash -------------------
+def shingles(text):
+    tokens = clean_text(text or "").split()
+    if len(tokens) < SHINGLE_SIZE:
+        return set(tokens)
+    return {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+def minhash_signature(text):
+    """Signature MinHash (array uint32 sepanjang NUM_PERM), atau None jika teks kosong setelah clean_text."""
+    sh = shingles(text)
+    if not sh:
+        return None
+    hv = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in sh), dtype=np.uint64, count=len(sh))
+    return (((hv[:, None] * _A + _B) % _MERSENNE) & _MASK32).min(axis=0).astype(np.uint32)
+
+def to_blob(sig):
+    return None if sig is None else sig.astype("<u4").tobytes()
+
+def from_blob(blob):
+    return np.frombuffer(blob, dtype="<u4")
+
+def similarity(a, b):
+    """Estimasi Jaccard dua signature (fraksi komponen yang sama)."""
+    return float(np.mean(a == b))
+
+def band_keys(sigs):
+    """Signature (n, NUM_PERM) → kunci band (n, LSH_BANDS) uint64."""
+    sigs = np.asarray(sigs, dtype=np.uint64).reshape(-1, LSH_BANDS, LSH_ROWS)
+    keys = np.zeros(sigs.shape[:2], dtype=np.uint64)
+    for r in range(LSH_ROWS):
+        keys = keys * _BAND_MIX + sigs[:, :, r]
+    return keys
+
+# ------------------- Index LSH di memori -------------------
+class MinHashLSH:
+    """
+    Index LSH atas signature feedback. Per band: array kunci terurut + id + sekolah_id
+    (pencarian dengan searchsorted), jadi memori ±20 byte per band per ulasan.
+    Baris baru ditampung di buffer kecil dan digabung ke array terurut
+    setelah merge_every baris.
+    """
+
+    def __init__(self, merge_every=20000):
+        self.merge_every = merge_every
+        self.keys = np.empty((LSH_BANDS, 0), dtype=np.uint64)
+        self.ids = np.empty((LSH_BANDS, 0), dtype=np.int64)
+        self.sids = np.empty((LSH_BANDS, 0), dtype=np.int32)  # sekolah_id per entri (-1 = tanpa sekolah)
+        self._pending_keys = np.empty((0, LSH_BANDS), dtype=np.uint64)
+        self._pending_ids = np.empty(0, dtype=np.int64)
+        self._pending_sids = np.empty(0, dtype=np.int32)
+        self.max_id = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return self.keys.shape[1] + len(self._pending_ids)
+
+    @property
+    def nbytes(self):
+        return (self.keys.nbytes + self.ids.nbytes + self.sids.nbytes + self._pending_keys.nbytes
+                + self._pending_ids.nbytes + self._pending_sids.nbytes)
+
+    def add(self, ids, keys, sids=None):
+        """
+        ids: array id feedback; keys: kunci band (n, LSH_BANDS) dari band_keys();
+        sids: sekolah_id per baris (None / -1 = tanpa sekolah).
+        """
+        if not len(ids):
+            return
+        sids = np.full(len(ids), -1, dtype=np.int32) if sids is None else np.asarray(sids, dtype=np.int32)
+        with self._lock:
+            self._pending_ids = np.concatenate([self._pending_ids, np.asarray(ids, dtype=np.int64)])
+            self._pending_sids = np.concatenate([self._pending_sids, sids])
+            self._pending_keys = np.concatenate([self._pending_keys, np.asarray(keys, dtype=np.uint64)])
+            self.max_id = max(self.max_id, int(np.max(ids)))
+            if len(self._pending_ids) >= self.merge_every:
+                self.merge()
+
+    def merge(self):
+        """Gabungkan buffer baris baru ke array terurut per band."""
+        with self._lock:
+            if not len(self._pending_ids):
+                return
+            keys = self._pending_keys.T
+            all_keys = np.concatenate([self.keys, keys], axis=1)
+            all_ids = np.concatenate([self.ids, np.broadcast_to(self._pending_ids, keys.shape)], axis=1)
+            all_sids = np.concatenate([self.sids, np.broadcast_to(self._pending_sids, keys.shape)], axis=1)
+            order = np.lexsort((all_ids, all_keys), axis=1)
+            self.keys = np.take_along_axis(all_keys, order, axis=1)
+            self.ids = np.take_along_axis(all_ids, order, axis=1)
+            self.sids = np.take_along_axis(all_sids, order, axis=1)
+            self._pending_keys = np.empty((0, LSH_BANDS), dtype=np.uint64)
+            self._pending_ids = np.empty(0, dtype=np.int64)
+            self._pending_sids = np.empty(0, dtype=np.int32)
+
+    def sync(self, chunk_size=20000):
+        """Tambahkan baris feedback ber-minhash yang id-nya > max_id (ditulis sesi/proses lain)."""
+        with self._lock:
+            ids, sids, keys = [], [], []
+            for rows in iter_minhash_chunks(chunk_size, after_id=self.max_id):
+                ids.append(np.array([r[0] for r in rows], dtype=np.int64))
+                sids.append(np.array([-1 if r[1] is None else r[1] for r in rows], dtype=np.int32))
+                keys.append(band_keys(np.stack([from_blob(r[2]) for r in rows])))
+            # Satu add untuk semua chunk: saat build awal cukup satu kali pengurutan
+            if ids:
+                self.add(np.concatenate(ids), np.concatenate(keys), np.concatenate(sids))
+            return len(self)
+
+    def query(self, sig, sekolah_id=None):
+        """
+        Id kandidat yang berbagi minimal satu band dengan sig. sekolah_id: hanya ulasan
+        sekolah itu, disaring sebelum batas MAX_CANDIDATES_PER_BAND agar bucket lintas
+        sekolah yang besar (frasa template) tidak menyembunyikan kandidat sekolah ini.
+        """
+        key = band_keys(sig[None, :])[0]
+        found = set()
+        with self._lock:
+            for b in range(LSH_BANDS):
+                lo = np.searchsorted(self.keys[b], key[b], side="left")
+                hi = np.searchsorted(self.keys[b], key[b], side="right")
+                bucket = self.ids[b, lo:hi]
+                if sekolah_id is not None:
+                    bucket = bucket[self.sids[b, lo:hi] == sekolah_id]
+                # Bucket besar: ambil id terbaru saja (urut id dalam satu kunci)
+                found.update(bucket[-MAX_CANDIDATES_PER_BAND:].tolist())
+            if len(self._pending_ids):
+                hit = (self._pending_keys == key).any(axis=1)
+                if sekolah_id is not None:
+                    hit &= self._pending_sids == sekolah_id
+                found.update(self._pending_ids[hit].tolist())
+        return found
+
+# ------------------- Index default per proses -------------------
+_default_index = None
+_default_lock = threading.Lock()
+
+def get_lsh_index():
+    """Index LSH per proses, dibangun dari DB saat pertama dipanggil."""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            index = MinHashLSH()
+            index.sync()
+            index.merge()
+            _default_index = index
+        return _default_index
+
+def find_near_duplicates(text, sekolah_id=None, threshold=DUP_THRESHOLD, min_words=MIN_WORDS, index=None):
+    """
+    Cari ulasan tersimpan yang hampir sama dengan text (estimasi Jaccard >= threshold).
+    sekolah_id: hanya ulasan untuk sekolah ini (None = semua sekolah).
+    Kembalikan (signature, matches); matches = list (id, sekolah_id, kemiripan, opini),
+    kosong jika text lebih pendek dari min_words kata. Signature dipakai ulang saat menyimpan.
+    """
+    sig = minhash_signature(text)
+    if sig is None or len(text.split()) < min_words:
+        return sig, []
+    if index is None:
+        index = get_lsh_index()
+    index.sync()
+    matches = []
+    for fid, sid, blob, opini in fetch_feedback_minhash(index.query(sig, sekolah_id)):
+        if sekolah_id is not None and sid != sekolah_id:
+            continue
+        score = similarity(sig, from_blob(blob))
+        if score >= threshold:
+            matches.append((fid, sid, score, opini))
+    matches.sort(key=lambda m: (-m[2], m[0]))
+    return sig, matches
+
+# ------------------- Isi minhash untuk ulasan lama -------------------
+def backfill_minhash(chunk_size=2000, progress=None):
+    """Hitung minhash untuk baris yang belum punya, per chunk. Kembalikan jumlah baris."""
+    done = 0
+    last_id = 0
+    start = time.perf_counter()
+    while True:
+        rows = fetch_feedback_without_minhash(last_id, chunk_size)
+        if not rows:
+            return done
+        update_feedback_minhash([(to_blob(minhash_signature(opini)), fid) for fid, opini in rows])
+        last_id = rows[-1][0]
+        done += len(rows)
+        if progress:
+            progress(done, time.perf_counter() - start)
+
+# ------------------- Laporan duplikat atas seluruh riwayat -------------------
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def dedup_report(threshold=DUP_THRESHOLD, min_words=MIN_WORDS, chunk_size=20000):
+    """
+    Kelompokkan ulasan hampir sama tanpa membandingkan semua pasangan: per band,
+    baris dengan kunci sama jadi bertetangga setelah diurutkan; hanya pasangan
+    tetangga itu yang dicek kemiripannya, lalu digabung (union-find).
+    Kembalikan (ringkasan, clusters) dengan clusters terurut dari yang terbesar.
+    """
+    ids, sids, sigs = [], [], []
+    for rows in iter_minhash_chunks(chunk_size, with_text=True):
+        for fid, sid, blob, opini in rows:
+            if len((opini or "").split()) >= min_words:
+                ids.append(fid)
+                sids.append(sid)
+                sigs.append(from_blob(blob))
+    n = len(ids)
+    summary = {"reviews": n, "clusters": 0, "reviews_in_clusters": 0, "threshold": threshold}
+    if n < 2:
+        return summary, []
+    ids = np.array(ids, dtype=np.int64)
+    sigs = np.stack(sigs)
+    keys = band_keys(sigs)
+
+    parent = list(range(n))
+    for b in range(LSH_BANDS):
+        order = np.lexsort((ids, keys[:, b]))
+        same = keys[order[1:], b] == keys[order[:-1], b]
+        a, c = order[:-1][same], order[1:][same]
+        ok = (sigs[a] == sigs[c]).mean(axis=1) >= threshold
+        for i, j in zip(a[ok].tolist(), c[ok].tolist()):
+            ri, rj = _find(parent, i), _find(parent, j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+
+    groups = {}
+    for i in range(n):
+        groups.setdefault(_find(parent, i), []).append(i)
+    clusters = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        schools = {}
+        for i in members:
+            schools[sids[i]] = schools.get(sids[i], 0) + 1
+        clusters.append({
+            "size": len(members),
+            "schools": dict(sorted(schools.items(), key=lambda kv: -kv[1])),
+            "ids": [int(ids[i]) for i in members],
+        })
+    clusters.sort(key=lambda cl: (-cl["size"], cl["ids"][0]))
+    summary["clusters"] = len(clusters)
+    summary["reviews_in_clusters"] = sum(cl["size"] for cl in clusters)
+    # Contoh teks satu ulasan per cluster
+    samples = {r[0]: r[3] for r in fetch_feedback_minhash(cl["ids"][0] for cl in clusters)}
+    for cl in clusters:
+        cl["sample"] = samples.get(cl["ids"][0])
+    return summary, clusters
@@ -0,0 +1,333 @@
+"""
+Impor massal data sekolah dan arsip ulasan dari CSV / JSONL / GeoJSON.
+File dibaca sebagai generator (baris demi baris, fitur demi fitur), divalidasi,
+lalu ditulis per chunk dengan executemany (satu transaksi per chunk), sehingga
+registri ratusan ribu sekolah tidak pernah dimuat seluruhnya ke memori.
+"""
+import csv
+import json
+import math
+import re
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+from db import get_sekolah_ids_by_nama, import_feedback_many, insert_or_update_sekolah, refresh_zonasi_grid
+
+FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".geojsonl": "jsonl",
+    ".json": "json",
+    ".geojson": "json",
+}
+
+# (lat_min, lon_min, lat_max, lon_max) — wilayah Indonesia dengan sedikit kelonggaran
+INDONESIA_BBOX = (-11.5, 94.5, 6.5, 141.5)
+
+# Nama kolom yang dikenali per field (dump registri memakai nama yang berbeda-beda)
+SEKOLAH_FIELDS = {
+    "nama": ("nama", "name", "nama_sekolah", "sekolah"),
+    "info": ("info", "alamat", "address", "keterangan"),
+    "lat": ("lat", "latitude", "lintang"),
+    "lon": ("lon", "lng", "long", "longitude", "bujur"),
+    "akreditasi": ("akreditasi", "accreditation"),
+}
+FEEDBACK_FIELDS = {
+    "sekolah_id": ("sekolah_id",),
+    "sekolah": ("sekolah", "nama_sekolah", "nama"),
+    "opini": ("opini", "ulasan", "review", "text", "teks"),
+    "pos_pct": ("pos_pct",),
+    "vader_compound": ("vader_compound",),
+    "created_at": ("created_at", "tanggal", "timestamp"),
+}
+
+MAX_ERRORS_KEPT = 20
+
+# ------------------- Pembaca sumber (generator) -------------------
+def detect_format(path):
+    fmt = FORMATS.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Format file tidak dikenali: {path} (pakai --format)")
+    return fmt
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            yield row
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def _iter_json_array(fp, key=None, bufsize=1 << 16):
+    """
+    Iterasi elemen array JSON tanpa memuat seluruh file:
+    key=None → array di level teratas, selain itu array milik key tsb
+    (mis. "features" pada FeatureCollection).
+    """
+    decoder = json.JSONDecoder()
+    start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key)) if key else re.compile(r"^\s*\[")
+    buf = ""
+    while True:
+        m = start.search(buf)
+        if m:
+            buf = buf[m.end():]
+            break
+        chunk = fp.read(bufsize)
+        if not chunk:
+            raise ValueError(f"Array JSON '{key or '[...]'}' tidak ditemukan")
+        # Sisakan ekor buffer agar penanda yang terpotong di batas chunk tetap ketemu
+        buf = (buf[-(len(key or "") + 64):] if key else buf) + chunk
+
+    pos = 0
+    eof = False
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            if pos >= len(buf):
+                raise ValueError("buffer habis")
+            item, end = decoder.raw_decode(buf, pos)
+        except ValueError:
+            # Elemen terpotong di batas chunk: baca lagi lalu coba ulang
+            if eof:
+                raise ValueError("JSON terpotong atau tidak valid")
+            chunk = fp.read(bufsize)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+        yield item
+        pos = end
+
+def read_json(path):
+    """Array record JSON biasa atau GeoJSON FeatureCollection."""
+    with open(path, encoding="utf-8-sig") as f:
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+        f.seek(0)
+        if head == "[":
+            yield from _iter_json_array(f)
+        else:
+            yield from _iter_json_array(f, "features")
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl, "json": read_json}
+
+def read_records(path, fmt=None):
+    """Generator dict per record; fitur GeoJSON diratakan jadi properties + lat/lon."""
+    for rec in READERS[fmt or detect_format(path)](path):
+        if isinstance(rec, dict) and rec.get("type") == "Feature":
+            rec = _flatten_feature(rec)
+        yield rec
+
+def _flatten_feature(feature):
+    rec = dict(feature.get("properties") or {})
+    geom = feature.get("geometry") or {}
+    if geom.get("type") == "Point":
+        coords = geom.get("coordinates") or []
+        if len(coords) >= 2:
+            rec["lon"], rec["lat"] = coords[0], coords[1]  # GeoJSON: [lon, lat]
+    return rec
+
+# ------------------- Validasi -------------------
+def _pick(rec, names):
+    for name in names:
+        value = rec.get(name)
+        if value not in (None, ""):
+            return value
+    return None
+
+def _to_float(value):
+    if isinstance(value, str):
+        value = value.strip()
+        if "," in value and "." not in value:
+            value = value.replace(",", ".")  # desimal gaya Indonesia: -6,2
+    return float(value)
+
+DAY_FIRST_FORMATS = ("%d/%m/%Y", "%d/%m/%Y %H:%M", "%d/%m/%Y %H:%M:%S")
+
+def parse_timestamp(value):
+    """
+    Tanggal ulasan → 'YYYY-MM-DD HH:MM:SS' (format CURRENT_TIMESTAMP SQLite, UTC), atau raise ValueError.
+    Menerima ISO 8601 (spasi atau 'T', zona waktu / 'Z' dikonversi ke UTC) dan dd/mm/yyyy [HH:MM[:SS]].
+    """
+    text = str(value).strip()
+    try:
+        dt = datetime.fromisoformat(text[:-1] + "+00:00" if text[-1:] in "Zz" and text else text)
+    except ValueError:
+        for fmt in DAY_FIRST_FORMATS:
+            try:
+                dt = datetime.strptime(text, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            raise ValueError(f"tanggal tidak dikenali: {value!r}")
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+def parse_coords(lat, lon, bbox=INDONESIA_BBOX):
+    """Kembalikan (lat, lon) float yang valid, atau raise ValueError."""
+    if lat is None or lon is None:
+        raise ValueError("koordinat kosong")
+    try:
+        lat, lon = _to_float(lat), _to_float(lon)
+    except (TypeError, ValueError):
+        raise ValueError(f"koordinat bukan angka: {lat!r}, {lon!r}")
+    if not (math.isfinite(lat) and math.isfinite(lon)):
+        raise ValueError("koordinat tidak hingga")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"koordinat di luar jangkauan: {lat}, {lon}")
+    if lat == 0 and lon == 0:
+        raise ValueError("koordinat (0, 0)")
+    if bbox and not (bbox[0] <= lat <= bbox[2] and bbox[1] <= lon <= bbox[3]):
+        raise ValueError(f"koordinat di luar bbox: {lat}, {lon}")
+    return lat, lon
+
+def sekolah_row(rec, bbox=INDONESIA_BBOX):
+    """Record → tuple (nama, info, lat, lon, akreditasi) untuk insert_or_update_sekolah."""
+    nama = _pick(rec, SEKOLAH_FIELDS["nama"])
+    if not nama or not str(nama).strip():
+        raise ValueError("nama sekolah kosong")
+    lat, lon = parse_coords(_pick(rec, SEKOLAH_FIELDS["lat"]), _pick(rec, SEKOLAH_FIELDS["lon"]), bbox)
+    info = _pick(rec, SEKOLAH_FIELDS["info"])
+    akreditasi = _pick(rec, SEKOLAH_FIELDS["akreditasi"])
+    return (str(nama).strip(), str(info or ""), lat, lon, str(akreditasi or ""))
+
+# ------------------- Pipeline -------------------
+class ImportReport:
+    """Ringkasan hasil impor: baris tertulis, baris dilewati, contoh error."""
+
+    def __init__(self):
+        self.rows = 0
+        self.skipped = 0
+        self.errors = []
+        self.start = time.perf_counter()
+
+    def skip(self, index, reason):
+        self.skipped += 1
+        if len(self.errors) < MAX_ERRORS_KEPT:
+            self.errors.append(f"record {index}: {reason}")
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.start
+
+    def as_dict(self):
+        seconds = self.seconds
+        return {
+            "rows": self.rows,
+            "skipped": self.skipped,
+            "seconds": round(seconds, 3),
+            "rows_per_sec": round(self.rows / seconds, 1) if seconds > 0 else None,
+            "errors": list(self.errors),
+        }
+
+def chunked(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _valid_rows(records, convert, report):
+    for index, rec in enumerate(records, start=1):
+        if not isinstance(rec, dict):
+            report.skip(index, "bukan objek")
+            continue
+        try:
+            yield index, convert(rec)
+        except ValueError as e:
+            report.skip(index, e)
+
+def import_sekolah(path, fmt=None, chunk_size=5000, bbox=INDONESIA_BBOX, progress=None):
+    """
+    Upsert sekolah dari file (berdasarkan nama, sama seperti insert_or_update_sekolah).
+    Grid zonasi dihitung ulang sekali di akhir, bukan per chunk.
+    progress: callable opsional (jumlah_baris, detik) dipanggil tiap chunk.
+    """
+    report = ImportReport()
+    rows = (row for _, row in _valid_rows(read_records(path, fmt), lambda r: sekolah_row(r, bbox), report))
+    for chunk in chunked(rows, chunk_size):
+        insert_or_update_sekolah(chunk, refresh_zonasi=False)
+        report.rows += len(chunk)
+        if progress:
+            progress(report.rows, report.seconds)
+    refresh_zonasi_grid()
+    return report
+
+def _feedback_fields(rec):
+    opini = _pick(rec, FEEDBACK_FIELDS["opini"])
+    if not opini or not str(opini).strip():
+        raise ValueError("opini kosong")
+    sid = _pick(rec, FEEDBACK_FIELDS["sekolah_id"])
+    nama = _pick(rec, FEEDBACK_FIELDS["sekolah"])
+    if sid is None and nama is None:
+        raise ValueError("tanpa sekolah_id / nama sekolah")
+    if sid is not None:
+        try:
+            sid = int(sid)
+        except (TypeError, ValueError):
+            raise ValueError(f"sekolah_id tidak valid: {sid!r}")
+    scores = []
+    for name in ("pos_pct", "vader_compound"):
+        value = _pick(rec, FEEDBACK_FIELDS[name])
+        try:
+            scores.append(None if value is None else _to_float(value))
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} bukan angka: {value!r}")
+    created_at = _pick(rec, FEEDBACK_FIELDS["created_at"])
+    if created_at is not None:
+        created_at = parse_timestamp(created_at)  # disimpan seragam agar urutan (created_at, id) dan filter tanggal benar
+    return sid, str(nama).strip() if nama is not None else None, str(opini), scores[0], scores[1], created_at
+
+def import_feedback(path, fmt=None, chunk_size=2000, score=False, workers=1, progress=None):
+    """
+    Impor arsip ulasan. Sekolah dirujuk lewat sekolah_id atau nama (harus sudah ada).
+    score=True → pos_pct / vader_compound dihitung saat impor (versi leksikon dicatat);
+    selain itu skor dari file dipakai apa adanya dengan lexicon_version NULL,
+    sehingga job rescore --stale akan menskor ulang baris tersebut nanti.
+    Signature MinHash (deteksi ulasan hampir sama) selalu dihitung saat impor.
+    """
+    from dedup import minhash_signature, to_blob
+    from sentiment import LEXICON_VERSION, detect_sentiment_batch, make_pool
+    from sentiment_cache import cached_detect_sentiment
+
+    report = ImportReport()
+    pool = make_pool(workers) if score and workers != 1 else None
+    try:
+        for chunk in chunked(_valid_rows(read_records(path, fmt), _feedback_fields, report), chunk_size):
+            ids = get_sekolah_ids_by_nama(f[1] for _, f in chunk if f[0] is None)
+            rows = []
+            for index, (sid, nama, opini, pos, vader, created_at) in chunk:
+                if sid is None:
+                    sid = ids.get(nama)
+                    if sid is None:
+                        report.skip(index, f"sekolah tidak ditemukan: {nama}")
+                        continue
+                rows.append([sid, opini, pos, vader, None, created_at, to_blob(minhash_signature(opini))])
+            if score and rows:
+                scores = detect_sentiment_batch(
+                    [r[1] for r in rows], workers=1, pool=pool, func=cached_detect_sentiment
+                )
+                for r, (pos, vader) in zip(rows, scores):
+                    r[2], r[3], r[4] = pos, vader, LEXICON_VERSION
+            import_feedback_many([tuple(r) for r in rows])
+            report.rows += len(rows)
+            if progress:
+                progress(report.rows, report.seconds)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return report
@@ -0,0 +1,176 @@
+import copy
+from functools import lru_cache
+from math import cos, log10, radians
+
+import folium
+import numpy as np
+from folium.plugins import Fullscreen, HeatMap, MeasureControl
+
+MAP_WIDTH = 700
+MAP_HEIGHT = 600
+DEFAULT_CENTER = (-6.2, 106.8)
+DEFAULT_ZOOM = 12
+
+MARKER_MIN_ZOOM = 14      # di bawah zoom ini sekolah digabung per sel grid
+MAX_MARKERS = 1500        # viewport berisi lebih banyak sekolah → tetap digabung
+LABEL_MAX_MARKERS = 150   # label nama permanen hanya jika marker sedikit
+GRID_CELL_PX = 64         # ukuran sel agregasi di layar (piksel)
+VIEW_PADDING = 0.25       # tambahan viewport per sisi, agar geser sedikit tidak kosong
+COVERAGE_MIN_ZOOM = 10    # heatmap cakupan zonasi hanya untuk viewport setingkat kota
+
+# ------------------- Peta dasar (dibangun sekali per proses) -------------------
+@lru_cache(maxsize=1)
+def _base_map_template():
+    m = folium.Map(location=DEFAULT_CENTER, zoom_start=DEFAULT_ZOOM)
+    Fullscreen(position="topright", title="Fullscreen", title_cancel="Exit Fullscreen", force_separate_button=True).add_to(m)
+    MeasureControl(position="bottomleft", primary_length_unit="meters").add_to(m)
+    folium.LayerControl(position="topright").add_to(m)
+    # Script heatmap ikut peta dasar, jadi layer cakupan bisa ditambah/dilepas tanpa memuat ulang peta
+    for name, url in HeatMap.default_js:
+        m.add_js_link(name, url)
+    return m
+
+def base_map():
+    """
+    Salinan peta dasar + plugin. Template tidak pernah diubah, jadi HTML peta
+    dasar identik di setiap rerun dan st_folium cukup mengganti layer sekolah
+    (feature_group_to_add) tanpa memuat ulang peta di browser.
+    """
+    return copy.deepcopy(_base_map_template())
+
+# ------------------- Viewport -------------------
+def _deg_per_px(zoom):
+    return 360 / (256 * 2 ** zoom)
+
+def view_bounds(center, zoom, width=MAP_WIDTH, height=MAP_HEIGHT):
+    """Perkiraan (south, west, north, east) peta berukuran width x height piksel."""
+    half_lon = _deg_per_px(zoom) * width / 2
+    half_lat = _deg_per_px(zoom) * height / 2 * cos(radians(center[0]))
+    return center[0] - half_lat, center[1] - half_lon, center[0] + half_lat, center[1] + half_lon
+
+def bounds_from_map_data(map_data):
+    """Bounds dari nilai kembali st_folium, atau None jika belum ada."""
+    try:
+        sw = map_data["bounds"]["_southWest"]
+        ne = map_data["bounds"]["_northEast"]
+        bounds = (float(sw["lat"]), float(sw["lng"]), float(ne["lat"]), float(ne["lng"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+    return bounds if bounds[0] < bounds[2] and bounds[1] < bounds[3] else None
+
+def pad_bounds(bounds, frac=VIEW_PADDING):
+    south, west, north, east = bounds
+    dlat, dlon = (north - south) * frac, (east - west) * frac
+    return south - dlat, west - dlon, north + dlat, east + dlon
+
+# ------------------- Statistik marker -------------------
+def school_stats_arrays(sekolah_df, stats_df):
+    """
+    Sejajarkan sekolah_stats dengan baris sekolah_df.
+    Kembalikan (pos_pct, review_count) sebagai array; pos_pct NaN jika belum ada ulasan.
+    """
+    pos = np.full(len(sekolah_df), np.nan)
+    cnt = np.zeros(len(sekolah_df), dtype=np.int64)
+    if len(stats_df):
+        position = dict(zip(sekolah_df["id"].tolist(), range(len(sekolah_df))))
+        for sid, p, c in zip(stats_df["sekolah_id"].tolist(), stats_df["pos_pct"].tolist(), stats_df["review_count"].tolist()):
+            i = position.get(sid)
+            if i is not None:
+                pos[i], cnt[i] = p, c
+    return pos, cnt
+
+def marker_color(avg):
+    if avg is None or np.isnan(avg):
+        return "gray"
+    return "green" if avg >= 70 else "orange" if avg >= 40 else "red"
+
+# ------------------- Heatmap cakupan zonasi -------------------
+def add_coverage_heatmap(layer, points):
+    """points: [lat, lon, jumlah_sekolah] per sel dari zonasi.coverage_points."""
+    if points:
+        # Bobot dinormalisasi ke sel dengan sekolah terbanyak di viewport
+        peak = max(p[2] for p in points)
+        HeatMap([[lat, lon, n / peak] for lat, lon, n in points], min_opacity=0.2, radius=25, blur=20,
+                max_zoom=14, gradient={0.2: "blue", 0.5: "lime", 1.0: "red"}).add_to(layer)
+    return layer
+
+# ------------------- Layer sekolah -------------------
+def grid_aggregate(lats, lons, pos, cnt, zoom):
+    """
+    Gabungkan titik per sel grid berukuran GRID_CELL_PX piksel pada zoom tsb.
+    Kembalikan dict array: lat/lon (rata-rata), schools, reviews, pos_pct (rata-rata
+    tertimbang jumlah ulasan; NaN jika tidak ada ulasan di sel itu) dan first
+    (indeks salah satu titik di sel, untuk sel berisi satu sekolah).
+    """
+    cell_lon = _deg_per_px(zoom) * GRID_CELL_PX
+    cell_lat = cell_lon * cos(radians(float(np.mean(lats)))) if len(lats) else cell_lon
+    key = np.floor(lats / cell_lat).astype(np.int64) * (1 << 32) + np.floor(lons / cell_lon).astype(np.int64)
+    _, first, inverse, schools = np.unique(key, return_index=True, return_inverse=True, return_counts=True)
+    reviews = np.bincount(inverse, weights=cnt)
+    pos_sum = np.bincount(inverse, weights=np.where(cnt > 0, np.nan_to_num(pos) * cnt, 0.0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pos_pct = np.where(reviews > 0, pos_sum / reviews, np.nan)
+    return {
+        "lat": np.bincount(inverse, weights=lats) / schools,
+        "lon": np.bincount(inverse, weights=lons) / schools,
+        "schools": schools,
+        "reviews": reviews.astype(np.int64),
+        "pos_pct": pos_pct,
+        "first": first,
+    }
+
+def _school_marker(nama, lat, lon, avg, count, label):
+    if count:
+        popup = f"<b>{nama}</b><br>Sentimen: {avg:.1f}%<br>Ulasan: {count}"
+    else:
+        popup = f"<b>{nama}</b><br>Belum ada ulasan"
+    return folium.CircleMarker(
+        [lat, lon],
+        radius=8,
+        color=marker_color(avg if count else None),
+        fill=True,
+        popup=popup,
+        tooltip=folium.Tooltip(nama, permanent=label, direction="top")
+    )
+
+def build_school_layer(sekolah_df, stats, rows, zoom, layer=None):
+    """
+    Isi FeatureGroup dengan sekolah pada posisi `rows` (sudah disaring viewport/radius).
+    Zoom dekat dengan sedikit sekolah → satu marker per sekolah; selain itu marker
+    gabungan per sel grid. Kembalikan (layer, mode) dengan mode "markers" / "grid".
+    """
+    layer = layer if layer is not None else folium.FeatureGroup(name="Sekolah")
+    pos, cnt = stats
+    names = sekolah_df["nama"].to_numpy()[rows]
+    lats = sekolah_df["lat"].to_numpy(dtype=np.float64)[rows]
+    lons = sekolah_df["lon"].to_numpy(dtype=np.float64)[rows]
+    pos, cnt = pos[rows], cnt[rows]
+
+    if zoom >= MARKER_MIN_ZOOM and len(rows) <= MAX_MARKERS:
+        label = len(rows) <= LABEL_MAX_MARKERS
+        for i in range(len(rows)):
+            _school_marker(names[i], lats[i], lons[i], pos[i], cnt[i], label).add_to(layer)
+        return layer, "markers"
+
+    cells = grid_aggregate(lats, lons, pos, cnt, zoom)
+    for i in range(len(cells["schools"])):
+        n, avg, reviews = int(cells["schools"][i]), cells["pos_pct"][i], int(cells["reviews"][i])
+        if n == 1:
+            # Sel berisi satu sekolah tetap digambar sebagai marker sekolah biasa
+            j = cells["first"][i]
+            _school_marker(names[j], lats[j], lons[j], pos[j], cnt[j], False).add_to(layer)
+            continue
+        lat, lon = float(cells["lat"][i]), float(cells["lon"][i])
+        summary = f"{n} sekolah<br>Ulasan: {reviews}"
+        if reviews:
+            summary += f"<br>Sentimen: {avg:.1f}%"
+        folium.CircleMarker(
+            [lat, lon],
+            radius=8 + 4 * log10(n),
+            color=marker_color(avg),
+            fill=True,
+            fill_opacity=0.5,
+            popup=summary,
+            tooltip=folium.Tooltip(str(n), permanent=True, direction="center")
+        ).add_to(layer)
+    return layer, "grid"
@@ -0,0 +1,108 @@
+from bisect import bisect_left
+import sys
+import numpy as np
+
+_PREFIX_END = "\U0010ffff"  # batas atas rentang awalan pada list terurut
+
+def normalize_nama(text):
+    """Kunci pencarian: huruf kecil, spasi dirapikan."""
+    return " ".join(str(text).casefold().split())
+
+# ------------------- Registri sekolah di memori -------------------
+class SchoolRegistry:
+    """
+    Salinan ringkas tabel sekolah untuk lookup tanpa DB: kolom sebagai array
+    (urutan baris sama dengan load_sekolah_df / SchoolIndex), dict nama → id
+    dan id → baris, plus dua index awalan terurut untuk typeahead:
+    nama lengkap ("sma negeri 1 ...") dan akhiran per kata ("pagar alam", ...).
+    Dibangun sekali per versi tabel sekolah (db.load_sekolah_registry).
+    """
+
+    def __init__(self, ids, names, lats, lons):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.names = [str(n) for n in names]
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self._id_by_name = dict(zip(self.names, self.ids.tolist()))
+        self._row_by_id = dict(zip(self.ids.tolist(), range(len(self.ids))))
+
+        keys = [normalize_nama(n) for n in self.names]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._name_keys = [keys[i] for i in order]
+        self._name_rows = np.array(order, dtype=np.int64)
+
+        suffixes = []
+        for row, key in enumerate(keys):
+            words = key.split(" ")
+            start = 0
+            for word in words[:-1]:
+                start += len(word) + 1
+                suffixes.append((key[start:], row))
+        suffixes.sort()
+        self._suffix_keys = [s for s, _ in suffixes]
+        self._suffix_rows = np.array([r for _, r in suffixes], dtype=np.int64)
+
+    @classmethod
+    def from_df(cls, df):
+        return cls(df["id"].to_numpy(), df["nama"].tolist(), df["lat"].to_numpy(), df["lon"].to_numpy())
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, nama):
+        return nama in self._id_by_name
+
+    @property
+    def nbytes(self):
+        strings = sum(sys.getsizeof(s) for s in self._suffix_keys) + 2 * sum(sys.getsizeof(s) for s in self.names)
+        return (self.ids.nbytes + self.lats.nbytes + self.lons.nbytes + self._name_rows.nbytes
+                + self._suffix_rows.nbytes + strings + 200 * len(self.ids))
+
+    # ---------- Lookup ----------
+    def id_of(self, nama):
+        """Id sekolah untuk nama persis, atau None."""
+        return self._id_by_name.get(nama)
+
+    def row_of(self, sekolah_id):
+        """Posisi baris (0..n-1) untuk id sekolah, atau None."""
+        return self._row_by_id.get(sekolah_id)
+
+    def row_of_nama(self, nama):
+        sekolah_id = self._id_by_name.get(nama)
+        return None if sekolah_id is None else self._row_by_id[sekolah_id]
+
+    def coords_of(self, nama):
+        """(lat, lon) sekolah untuk nama persis, atau None."""
+        row = self.row_of_nama(nama)
+        return None if row is None else (float(self.lats[row]), float(self.lons[row]))
+
+    # ---------- Typeahead ----------
+    @staticmethod
+    def _prefix_range(keys, prefix):
+        return bisect_left(keys, prefix), bisect_left(keys, prefix + _PREFIX_END)
+
+    def search(self, query, limit=50):
+        """
+        Posisi baris sekolah yang namanya berawalan query, lalu yang salah satu
+        katanya berawalan query (tanpa membedakan huruf besar/kecil), masing-masing
+        urut abjad; maksimal limit baris. Query kosong → limit baris pertama.
+        """
+        q = normalize_nama(query)
+        if not q:
+            return np.arange(min(limit, len(self.ids)), dtype=np.int64)
+        lo, hi = self._prefix_range(self._name_keys, q)
+        rows = self._name_rows[lo:min(hi, lo + limit)].tolist()
+        if len(rows) < limit:
+            seen = set(rows)
+            lo, hi = self._prefix_range(self._suffix_keys, q)
+            for i in range(lo, hi):  # berhenti begitu limit terpenuhi, walau rentangnya ribuan
+                row = int(self._suffix_rows[i])
+                if row not in seen:
+                    seen.add(row)
+                    rows.append(row)
+                    if len(rows) >= limit:
+                        break
+        return np.array(rows, dtype=np.int64)
+
+    def search_names(self, query, limit=50):
+        return [self.names[r] for r in self.search(query, limit).tolist()]
@@ -0,0 +1,92 @@
+import threading
+import time
+from db import (
+    iter_feedback_chunks,
+    fetch_stale_feedback,
+    get_rescore_checkpoint,
+    reset_rescore_checkpoint,
+    update_feedback_scores,
+)
+from sentiment import LEXICON_VERSION, detect_sentiment_batch, make_pool
+from sentiment_cache import cached_detect_sentiment
+
+# ------------------- Re-scoring seluruh tabel feedback -------------------
+def rescore_feedback(chunk_size=2000, workers=None, progress=None):
+    """
+    Hitung ulang pos_pct / vader_compound semua baris feedback.
+    Baris dibaca per chunk dari SQLite, diskor di process pool (analyzer dimuat
+    sekali per worker), lalu ditulis kembali dengan executemany per chunk.
+    Tiap worker memakai memo cache sendiri, jadi ulasan kembar cukup diskor sekali.
+    progress: callable opsional (jumlah_baris, detik) dipanggil tiap chunk.
+    Kembalikan jumlah baris yang diproses.
+    """
+    done = 0
+    start = time.perf_counter()
+    with make_pool(workers) as pool:
+        for rows in iter_feedback_chunks(chunk_size):
+            ids = [r[0] for r in rows]
+            scores = detect_sentiment_batch((r[1] or "" for r in rows), pool=pool, func=cached_detect_sentiment)
+            update_feedback_scores([(pos, vader, LEXICON_VERSION, fid) for fid, (pos, vader) in zip(ids, scores)])
+            done += len(rows)
+            if progress:
+                progress(done, time.perf_counter() - start)
+    return done
+
+# ------------------- Re-scoring inkremental (hanya baris usang) -------------------
+def rescore_stale(chunk_size=500, workers=1, progress=None, pause=0.0, stop_event=None, from_start=False):
+    """
+    Skor ulang hanya baris yang lexicon_version-nya berbeda dari LEXICON_VERSION.
+    Setiap chunk ditulis bersama checkpoint (id terakhir) dalam satu transaksi,
+    jadi job yang terhenti akan melanjutkan dari chunk berikutnya.
+    pause: jeda antar chunk (detik) agar lock DB bisa dipakai request lain.
+    Kembalikan jumlah baris yang diproses.
+    """
+    if from_start:
+        reset_rescore_checkpoint(LEXICON_VERSION)
+    last_id = get_rescore_checkpoint(LEXICON_VERSION)
+    done = 0
+    start = time.perf_counter()
+    pool = make_pool(workers) if workers != 1 else None
+    try:
+        while not (stop_event and stop_event.is_set()):
+            rows = fetch_stale_feedback(LEXICON_VERSION, last_id, chunk_size)
+            if not rows:
+                break
+            texts = [r[1] or "" for r in rows]
+            scores = detect_sentiment_batch(texts, workers=1, pool=pool, func=cached_detect_sentiment)
+            last_id = rows[-1][0]
+            update_feedback_scores(
+                [(pos, vader, LEXICON_VERSION, r[0]) for r, (pos, vader) in zip(rows, scores)],
+                checkpoint=(LEXICON_VERSION, last_id)
+            )
+            done += len(rows)
+            if progress:
+                progress(done, time.perf_counter() - start)
+            if pause:
+                time.sleep(pause)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return done
+
+# ------------------- Job latar belakang di proses app -------------------
+_background_thread = None
+_background_lock = threading.Lock()
+
+def start_background_rescore(chunk_size=200, pause=0.05):
+    """
+    Jalankan rescore_stale di thread daemon (satu per proses).
+    Chunk kecil + jeda supaya request Streamlit tidak ikut tertahan.
+    """
+    global _background_thread
+    with _background_lock:
+        if _background_thread is not None and _background_thread.is_alive():
+            return _background_thread
+        _background_thread = threading.Thread(
+            target=rescore_stale,
+            kwargs={"chunk_size": chunk_size, "workers": 1, "pause": pause},
+            name="rescore-stale",
+            daemon=True,
+        )
+        _background_thread.start()
+        return _background_thread
@@ -1,8 +1,10 @@
+import hashlib
+import heapq
+import json
 import re
-from textblob import TextBlob
+from concurrent.futures import ProcessPoolExecutor
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-
-sia = SentimentIntensityAnalyzer()
+from timing import traced
 
 # ------------------- Lexicon Indonesia -------------------
 vader_indo = {
@@ -24,7 +26,13 @@ vader_indo = {
     "sangat": 0.8, "banget": 0.9, "sekali": 0.7, "terlalu": 0.6, "super": 1.0,
     "agak": -0.3, "sedikit": -0.3,
 }
-sia.lexicon.update(vader_indo)
+
+def build_analyzer():
+    analyzer = SentimentIntensityAnalyzer()
+    analyzer.lexicon.update(vader_indo)
+    return analyzer
+
+sia = build_analyzer()
 
 # ------------------- Kamus Custom -------------------
 custom_dict = {
@@ -76,19 +84,109 @@ stopwords = [
     "karena","bahwa","agar"
 ]
 
-# ------------------- Helper -------------------
-def _replace_word_with_boundary(text: str, old: str, new: str) -> str:
-    pattern = r"\b" + re.escape(old) + r"\b"
-    return re.sub(pattern, new, text, flags=re.IGNORECASE)
+# ------------------- Mesin pencocokan leksikon -------------------
+# Semua pola dikompilasi sekali saat import. Aturan koreksi tetap dijalankan
+# berurutan (phrase_corrections lalu corrections, sesuai urutan dict) supaya
+# hasilnya identik dengan penggantian satu per satu, tapi hanya aturan yang
+# kata-katanya muncul di teks yang benar-benar dieksekusi.
+_WORD_RE = re.compile(r"\w+")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+_SPACE_RE = re.compile(r"\s+")
+_STOPWORDS = frozenset(stopwords)
+
+def _compile_rules(*tables):
+    rules = []
+    index = {}
+    for table in tables:
+        for old, new in table.items():
+            pattern = r"\b" + re.escape(old) + r"\b"
+            words = frozenset(_WORD_RE.findall(old))
+            for w in words:
+                index.setdefault(w, []).append(len(rules))
+            rules.append((
+                re.compile(pattern, flags=re.IGNORECASE),
+                re.compile(pattern),
+                new,
+                words,
+                frozenset(_WORD_RE.findall(new)),
+            ))
+    return rules, index
 
+def _compile_phrase_trie(table):
+    # Trie per token; daun menyimpan (prioritas = urutan di dict, skor)
+    trie = {}
+    for priority, (phrase, score) in enumerate(table.items()):
+        node = trie
+        for word in phrase.split():
+            node = node.setdefault(word, {})
+        node[None] = (priority, score)
+    return trie
+
+_RULES, _RULE_INDEX = _compile_rules(phrase_corrections, corrections)
+_PHRASE_TRIE = _compile_phrase_trie(custom_dict)
+
+def _apply_corrections(text: str, ignore_case: bool = True):
+    """Jalankan phrase_corrections + corrections; kembalikan (teks, ada_koreksi)."""
+    tokens = set(_WORD_RE.findall(text))
+    pending = sorted({i for w in tokens for i in _RULE_INDEX.get(w, ())})
+    queued = set(pending)
+    found = False
+    while pending:
+        i = heapq.heappop(pending)
+        pattern_ci, pattern, new, words, new_words = _RULES[i]
+        if not words <= tokens:
+            continue
+        text, n = (pattern_ci if ignore_case else pattern).subn(new, text)
+        if not n:
+            continue
+        found = True
+        # Hasil penggantian bisa membentuk frasa untuk aturan berikutnya
+        tokens |= new_words
+        for w in new_words:
+            for j in _RULE_INDEX.get(w, ()):
+                if j > i and j not in queued:
+                    queued.add(j)
+                    heapq.heappush(pending, j)
+    return text, found
+
+def _match_phrases(tokens):
+    """
+    Satu kali scan kiri-ke-kanan atas token hasil clean_text.
+    Frasa yang lebih awal di custom_dict menang jika tumpang tindih, sama seperti
+    findall + hapus per frasa. Kembalikan (positif, total, token_sisa).
+    """
+    candidates = []
+    n_tokens = len(tokens)
+    for start in range(n_tokens):
+        node = _PHRASE_TRIE
+        for end in range(start, n_tokens):
+            node = node.get(tokens[end])
+            if node is None:
+                break
+            hit = node.get(None)
+            if hit is not None:
+                candidates.append((hit[0], start, end + 1, hit[1]))
+    if not candidates:
+        return 0, 0, tokens
+    candidates.sort()
+    claimed = [False] * n_tokens
+    positive_count = 0
+    total_count = 0
+    for _, start, end, score in candidates:
+        if any(claimed[start:end]):
+            continue
+        claimed[start:end] = [True] * (end - start)
+        total_count += 1
+        if score > 0:
+            positive_count += 1
+    rest = [t for t, used in zip(tokens, claimed) if not used]
+    return positive_count, total_count, rest
+
+# ------------------- Helper -------------------
 def clean_text(text: str) -> str:
-    text = text.lower()
-    for old,new in phrase_corrections.items():
-        text = _replace_word_with_boundary(text, old, new)
-    for old,new in corrections.items():
-        text = _replace_word_with_boundary(text, old, new)
-    text = re.sub(r"[^a-z0-9\s]", " ", text)
-    words = [w for w in re.split(r"\s+", text) if w and w not in stopwords]
+    text, _ = _apply_corrections(text.lower())
+    text = _NON_ALNUM_RE.sub(" ", text)
+    words = [w for w in _SPACE_RE.split(text) if w and w not in _STOPWORDS]
     return " ".join(words)
 
 # ------------------- Detect Sentiment -------------------
@@ -99,39 +197,79 @@ NORMALIZE_MAP = {
     "mengecewakan":"disappointing",
 }
 
+# Polaritas TextBlob untuk setiap nilai NORMALIZE_MAP (dihitung sekali, bukan per request).
+# Kata baru di NORMALIZE_MAP yang belum ada di sini dihitung otomatis saat import;
+# untuk memperbarui tabel ini jalankan build_normalize_polarity() lalu salin hasilnya.
+NORMALIZE_POLARITY = {
+    "good": 0.7, "great": 0.8, "satisfied": 0.5, "friendly": 0.375,
+    "fast": 0.2, "clean": 0.3666666666666667, "bad": -0.6999999999999998,
+    "slow": -0.30000000000000004, "dirty": -0.6, "disappointed": -0.75,
+    "disappointing": -0.6,
+}
+
+def build_normalize_polarity(words=None):
+    """Hitung ulang polaritas TextBlob (TextBlob hanya di-import di sini)."""
+    from textblob import TextBlob
+    if words is None:
+        words = dict.fromkeys(NORMALIZE_MAP.values())
+    return {w: TextBlob(w).sentiment.polarity for w in words}
+
+_missing_polarity = [w for w in dict.fromkeys(NORMALIZE_MAP.values()) if w not in NORMALIZE_POLARITY]
+if _missing_polarity:
+    NORMALIZE_POLARITY.update(build_normalize_polarity(_missing_polarity))
+
+INTENSIFIERS = ["banget", "sekali", "sangat", "super", "terlalu"]
+
+# ------------------- Versi leksikon -------------------
+def lexicon_fingerprint() -> str:
+    """
+    Hash deterministik dari semua tabel yang mempengaruhi skor.
+    Urutan entri ikut di-hash karena urutan dict menentukan prioritas frasa.
+    """
+    payload = json.dumps(
+        [
+            ["vader_indo", list(vader_indo.items())],
+            ["custom_dict", list(custom_dict.items())],
+            ["corrections", list(corrections.items())],
+            ["phrase_corrections", list(phrase_corrections.items())],
+            ["stopwords", list(stopwords)],
+            ["NORMALIZE_MAP", list(NORMALIZE_MAP.items())],
+            ["NORMALIZE_POLARITY", [[w, NORMALIZE_POLARITY[w]] for w in NORMALIZE_MAP.values()]],
+            ["INTENSIFIERS", list(INTENSIFIERS)],
+        ],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+LEXICON_VERSION = lexicon_fingerprint()
+
+def normalized_word_counts(word: str):
+    """(tambahan positif, tambahan total) untuk kata yang ada di NORMALIZE_MAP."""
+    if NORMALIZE_POLARITY[NORMALIZE_MAP[word]] > 0:
+        return 1, 1
+    return 0, 0
+
+@traced(rows=False)
 def detect_sentiment(text: str):
     if not text or not text.strip():
         return 0.0, 0.0
+    return score_cleaned(clean_text(text))
 
-    cleaned = clean_text(text)
-    text_lower = cleaned.lower()
-    INTENSIFIERS = ["banget", "sekali", "sangat", "super", "terlalu"]
-
+@traced(rows=False)
+def score_cleaned(cleaned: str):
+    """Skor (pos_pct, vader_compound) untuk teks yang sudah melalui clean_text."""
     # Hitung positif dan total kata relevan saja
-    positive_count = 0
-    total_count = 0
-
-    for phrase, score in custom_dict.items():
-        pattern = r"\b" + re.escape(phrase) + r"\b"
-        matches = re.findall(pattern, text_lower)
-        for _ in matches:
-            total_count += 1
-            if score > 0:
-                positive_count += 1
-        text_lower = re.sub(pattern, " ", text_lower)
+    positive_count, total_count, rest = _match_phrases(cleaned.split())
 
-    for word in text_lower.split():
+    for word in rest:
         if word in INTENSIFIERS:
             positive_count += 1
             total_count += 1
         elif word in NORMALIZE_MAP:
-            tb_word = NORMALIZE_MAP[word]
-            try:
-                if TextBlob(tb_word).sentiment.polarity > 0:
-                    positive_count += 1
-                    total_count += 1
-            except:
-                total_count += 1
+            pos, tot = normalized_word_counts(word)
+            positive_count += pos
+            total_count += tot
         else:
             continue
 
@@ -139,23 +277,44 @@ def detect_sentiment(text: str):
     vader_score = sia.polarity_scores(cleaned).get("compound", 0.0)
     return pos_pct, vader_score
 
+# ------------------- Batch scoring (process pool) -------------------
+def _init_worker():
+    # Dipanggil sekali per proses worker: muat analyzer + vader_indo sekali saja
+    global sia
+    sia = build_analyzer()
+
+def make_pool(workers=None):
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+def detect_sentiment_batch(texts, workers=None, chunksize=256, pool=None, func=detect_sentiment):
+    """
+    Hitung detect_sentiment untuk banyak teks sekaligus.
+    workers=1 → jalan di proses ini; selain itu pakai process pool
+    (pool yang sudah ada bisa dipakai ulang lewat argumen pool).
+    func: fungsi skor per teks (harus top-level agar bisa di-pickle),
+    misalnya sentiment_cache.cached_detect_sentiment.
+    Kembalikan list (pos_pct, vader_compound) dengan urutan sama seperti texts.
+    """
+    texts = list(texts)
+    if pool is not None:
+        return list(pool.map(func, texts, chunksize=chunksize))
+    if workers == 1 or len(texts) <= chunksize:
+        return [func(t) for t in texts]
+    with make_pool(workers) as own_pool:
+        return list(own_pool.map(func, texts, chunksize=chunksize))
+
 # ------------------- Koreksi kalimat negatif -------------------
-def correct_negative_sentence(sentence: str):
+@traced(rows=False)
+def correct_negative_sentence(sentence: str, vader_score=None):
+    """
+    vader_score: skor compound yang sudah dihitung detect_sentiment untuk kalimat
+    yang sama (opsional), supaya VADER tidak dijalankan dua kali.
+    """
     if not sentence:
         return False, sentence
-    corrected = sentence.lower()
-    found = False
-    for neg,pos in phrase_corrections.items():
-        pattern = r"\b" + re.escape(neg) + r"\b"
-        if re.search(pattern, corrected):
-            corrected = re.sub(pattern, pos, corrected)
-            found = True
-    for neg,pos in corrections.items():
-        pattern = r"\b" + re.escape(neg) + r"\b"
-        if re.search(pattern, corrected):
-            corrected = re.sub(pattern, pos, corrected)
-            found = True
-    vader_score = sia.polarity_scores(clean_text(sentence)).get("compound",0.0)
+    corrected, found = _apply_corrections(sentence.lower(), ignore_case=False)
+    if vader_score is None:
+        vader_score = sia.polarity_scores(clean_text(sentence)).get("compound",0.0)
     if found or vader_score < 0:
         return True, corrected.capitalize()
     return False, sentence
@@ -0,0 +1,177 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from sentiment import LEXICON_VERSION, clean_text, score_cleaned
+
+# ------------------- Memo cache hasil sentimen -------------------
+class SentimentCache:
+    """
+    Cache LRU untuk (pos_pct, vader_compound).
+    Kunci = hash dari hasil clean_text + LEXICON_VERSION, jadi teks yang hanya
+    beda huruf besar/kecil atau tanda baca memakai entri yang sama, dan entri
+    otomatis tidak terpakai lagi saat leksikon berubah.
+    db_path: file SQLite opsional sebagai tier kedua (tetap ada setelah restart),
+    dibatasi l2_maxsize baris (entri tertua dibuang).
+    """
+
+    def __init__(self, maxsize=10000, db_path=None, l2_maxsize=50000):
+        self.maxsize = maxsize
+        self.l2_maxsize = l2_maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.l2_hits = 0
+        self._conn = None
+        self._read_conn = None
+        if db_path is not None:
+            self._open_l2(db_path)
+
+    # ---------- Tier kedua (SQLite) ----------
+    def _open_l2(self, db_path):
+        # Import di sini: worker process pool (tanpa tier kedua) tidak perlu membuka koneksi db
+        from db import _connect, db_lock
+
+        self._conn = _connect(path=db_path)  # PRAGMA sama dengan koneksi aplikasi (WAL, busy_timeout, ...)
+        self._write_lock = db_lock  # Tulis diserialkan dengan penulis utama proses ini
+        # Koneksi baca terpisah (WAL): lookup tier kedua tidak menunggu tulis yang sedang berjalan
+        self._read_conn = _connect(read_only=True, path=db_path)
+        self._read_lock = threading.Lock()
+        with self._write_lock:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS sentiment_cache (
+                    key TEXT PRIMARY KEY,
+                    lexicon_version TEXT,
+                    pos_pct REAL,
+                    vader_compound REAL
+                )
+            """)
+            # Entri dari versi leksikon lain tidak akan pernah cocok lagi
+            self._conn.execute("DELETE FROM sentiment_cache WHERE lexicon_version != ?", (LEXICON_VERSION,))
+            self._conn.commit()
+
+    def _l2_get(self, key):
+        with self._read_lock:
+            try:
+                row = self._read_conn.execute(
+                    "SELECT pos_pct, vader_compound FROM sentiment_cache WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error:
+                return None  # Cache saja: anggap miss
+        return (row[0], row[1]) if row else None
+
+    def _l2_put(self, key, value):
+        with self._write_lock:
+            try:
+                # INSERT OR REPLACE memberi rowid baru → rowid terkecil = entri yang paling lama tidak ditulis
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sentiment_cache (key, lexicon_version, pos_pct, vader_compound) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, LEXICON_VERSION, value[0], value[1])
+                )
+                self._conn.execute(
+                    "DELETE FROM sentiment_cache WHERE rowid <= (SELECT MAX(rowid) FROM sentiment_cache) - ?",
+                    (self.l2_maxsize,)
+                )
+                self._conn.commit()
+            except sqlite3.Error:
+                self._conn.rollback()  # Cache saja: skor tetap dikembalikan walau gagal disimpan
+
+    def _l2_rows(self):
+        if self._read_conn is None:
+            return None
+        with self._read_lock:
+            try:
+                return self._read_conn.execute("SELECT COUNT(1) FROM sentiment_cache").fetchone()[0]
+            except sqlite3.Error:
+                return None
+
+    # ---------- API ----------
+    @staticmethod
+    def make_key(cleaned: str) -> str:
+        return hashlib.blake2b(
+            (LEXICON_VERSION + "\0" + cleaned).encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+    def detect_sentiment(self, text: str, l2=True):
+        """
+        Sama dengan sentiment.detect_sentiment, tetapi lewat cache.
+        l2=False → hanya tier memori (jalur batch: rescore, impor).
+        """
+        if not text or not text.strip():
+            return 0.0, 0.0
+        cleaned = clean_text(text)
+        key = self.make_key(cleaned)
+        # self._lock hanya untuk dict memori; tier SQLite punya koneksi dan lock sendiri,
+        # jadi hit memori sesi lain tidak pernah menunggu baca/tulis disk
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+        use_l2 = l2 and self._conn is not None
+        if use_l2:
+            value = self._l2_get(key)
+            if value is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.l2_hits += 1
+                    self._remember(key, value)
+                return value
+        with self._lock:
+            self.misses += 1
+
+        value = score_cleaned(cleaned)
+        with self._lock:
+            self._remember(key, value)
+        if use_l2:
+            self._l2_put(key, value)
+        return value
+
+    def _remember(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "l2_hits": self.l2_hits,
+            }
+        stats["l2_rows"] = self._l2_rows()  # Di luar self._lock, seperti baca tier kedua lainnya
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+# ------------------- Cache default per proses -------------------
+_default_cache = None
+_default_lock = threading.Lock()
+
+def get_default_cache(db_path=None, maxsize=10000):
+    """
+    Satu cache per proses. Panggilan pertama menentukan konfigurasi
+    (app memberi db_path; worker process pool cukup memakai tier memori).
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = SentimentCache(maxsize=maxsize, db_path=db_path)
+        return _default_cache
+
+def cached_detect_sentiment(text: str):
+    # Top-level agar bisa dipakai sebagai func di detect_sentiment_batch. Jalur batch hanya
+    # memakai tier memori: satu baris + commit SQLite per ulasan akan menyalin seluruh korpus
+    # ke sentiment_cache dan bersaing dengan penulis utama setiap kali leksikon berubah.
+    return get_default_cache().detect_sentiment(text, l2=False)
@@ -0,0 +1,132 @@
+import numpy as np
+from sentiment import (
+    INTENSIFIERS,
+    NORMALIZE_MAP,
+    clean_text,
+    custom_dict,
+    normalized_word_counts,
+    vader_indo,
+)
+
+# ------------------- Scoring pos_pct berbasis matriks token -------------------
+class TokenMatrixScorer:
+    """
+    Backend kedua untuk pos_pct: satu batch teks diubah jadi array id token,
+    lalu setiap frasa custom_dict dicocokkan sekaligus untuk seluruh batch
+    dengan operasi NumPy. Hasilnya sama dengan detect_sentiment(text)[0]
+    (frasa yang lebih awal di custom_dict tetap menang jika tumpang tindih).
+    Skor VADER tidak dihitung di sini.
+    """
+
+    def __init__(self):
+        # Id 0 dipakai untuk token di luar kosakata
+        words = set(INTENSIFIERS) | set(NORMALIZE_MAP)
+        for table in (custom_dict, vader_indo):
+            for phrase in table:
+                words.update(phrase.split())
+        self.vocab = {w: i for i, w in enumerate(sorted(words), start=1)}
+        size = len(self.vocab) + 1
+
+        # Bobot token yang tidak termakan frasa: intensifier dan NORMALIZE_MAP
+        self.rest_pos = np.zeros(size, dtype=np.int64)
+        self.rest_tot = np.zeros(size, dtype=np.int64)
+        for word in NORMALIZE_MAP:
+            pos, tot = normalized_word_counts(word)
+            self.rest_pos[self.vocab[word]] = pos
+            self.rest_tot[self.vocab[word]] = tot
+        for word in INTENSIFIERS:
+            self.rest_pos[self.vocab[word]] = 1
+            self.rest_tot[self.vocab[word]] = 1
+
+        # Frasa dalam urutan prioritas: (array id token, skor positif?)
+        self.phrases = [
+            (np.array([self.vocab[w] for w in phrase.split()], dtype=np.int64), score > 0)
+            for phrase, score in custom_dict.items()
+            if phrase.split()
+        ]
+
+    def tokenize(self, texts):
+        """Kembalikan (ids, doc) : id token datar dan indeks dokumen per token."""
+        ids = []
+        lengths = []
+        get = self.vocab.get
+        for text in texts:
+            tokens = clean_text(text).split() if text and text.strip() else []
+            ids.extend(get(t, 0) for t in tokens)
+            lengths.append(len(tokens))
+        ids = np.array(ids, dtype=np.int64)
+        doc = np.repeat(np.arange(len(lengths)), lengths)
+        return ids, doc
+
+    def score_counts(self, texts):
+        """Kembalikan (positive_count, total_count) per teks sebagai array."""
+        texts = list(texts)
+        n_docs = len(texts)
+        ids, doc = self.tokenize(texts)
+        n = len(ids)
+        positive = np.zeros(n_docs, dtype=np.int64)
+        total = np.zeros(n_docs, dtype=np.int64)
+        if n == 0:
+            return positive, total
+
+        claimed = np.zeros(n, dtype=bool)
+        # Posisi tiap id token (untuk mencari kandidat awal frasa tanpa scan penuh)
+        order = np.argsort(ids, kind="stable")
+        bounds = np.searchsorted(ids[order], np.arange(len(self.vocab) + 2))
+
+        for phrase_ids, is_positive in self.phrases:
+            k = len(phrase_ids)
+            first = phrase_ids[0]
+            starts = order[bounds[first]:bounds[first + 1]]
+            starts = starts[starts + k <= n]
+            if len(starts) == 0:
+                continue
+            ok = doc[starts] == doc[starts + k - 1]
+            for j in range(k):
+                ok &= ~claimed[starts + j]
+                if j:
+                    ok &= ids[starts + j] == phrase_ids[j]
+            starts = starts[ok]
+            if len(starts) == 0:
+                continue
+            if k > 1 and np.any(np.diff(starts) < k):
+                starts = self._non_overlapping(starts, k)
+            span = (starts[:, None] + np.arange(k)).ravel()
+            claimed[span] = True
+            hits = np.bincount(doc[starts], minlength=n_docs)
+            total += hits
+            if is_positive:
+                positive += hits
+
+        rest = ~claimed
+        positive += np.bincount(doc[rest], weights=self.rest_pos[ids[rest]], minlength=n_docs).astype(np.int64)
+        total += np.bincount(doc[rest], weights=self.rest_tot[ids[rest]], minlength=n_docs).astype(np.int64)
+        return positive, total
+
+    @staticmethod
+    def _non_overlapping(starts, k):
+        # Frasa berulang yang tumpang tindih dengan dirinya sendiri: ambil dari kiri
+        kept = []
+        next_free = -1
+        for s in starts.tolist():
+            if s >= next_free:
+                kept.append(s)
+                next_free = s + k
+        return np.array(kept, dtype=np.int64)
+
+    def pos_pct(self, texts):
+        """pos_pct untuk setiap teks (array float64)."""
+        positive, total = self.score_counts(texts)
+        out = np.zeros(len(total), dtype=np.float64)
+        nz = total > 0
+        out[nz] = positive[nz] / total[nz] * 100
+        return out
+
+# ------------------- Instance default -------------------
+_default_scorer = None
+
+def pos_pct_batch(texts):
+    global _default_scorer
+    if _default_scorer is None:
+        _default_scorer = TokenMatrixScorer()
+    return _default_scorer.pos_pct(texts)
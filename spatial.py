@@ -0,0 +1,192 @@
+from math import radians, cos
+import numpy as np
+
+EARTH_RADIUS_M = 6371000
+METERS_PER_DEG = np.pi * EARTH_RADIUS_M / 180  # ±111.2 km per derajat lintang
+
+# ------------------- Haversine -------------------
+def haversine_np(lat, lon, lats, lons):
+    """Jarak (meter) dari satu titik ke banyak titik sekaligus (array NumPy)."""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlon = np.radians(lons) - np.radians(lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_M * (2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a)))
+
+# ------------------- Sel grid zonasi -------------------
+def zonasi_cell_deg(tier):
+    """Ukuran sel (derajat) untuk tier radius: satu sel ±tier meter ke arah lintang."""
+    return tier / METERS_PER_DEG
+
+def cell_of(lat, lon, cell_deg):
+    return int(np.floor(lat / cell_deg)), int(np.floor(lon / cell_deg))
+
+def cells_covering(lats, lons, r, cell_deg):
+    """
+    Untuk setiap titik, semua sel grid yang jarak terdekatnya ke titik ≤ r meter
+    (sedikit longgar; pengecekan jarak persis dilakukan saat query).
+    Kembalikan (idx, ci, cj) : indeks titik dan indeks sel, sebagai array.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    n = len(lats)
+    if n == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    dlat = r / METERS_PER_DEG
+    coslat = np.maximum(np.cos(np.radians(np.minimum(np.abs(lats) + dlat, 89.9))), 1e-6)
+    ki = int(np.ceil(dlat / cell_deg)) + 1
+    kj = int(np.ceil(float(np.max(dlat / coslat)) / cell_deg)) + 1
+    di, dj = np.meshgrid(np.arange(-ki, ki + 1), np.arange(-kj, kj + 1), indexing="ij")
+    di, dj = di.ravel(), dj.ravel()
+
+    idx = np.repeat(np.arange(n), len(di))
+    ci = np.floor(lats / cell_deg).astype(np.int64)[idx] + np.tile(di, n)
+    cj = np.floor(lons / cell_deg).astype(np.int64)[idx] + np.tile(dj, n)
+    # Titik terdekat di dalam sel = koordinat titik yang di-clamp ke batas sel
+    plat, plon = lats[idx], lons[idx]
+    clat = np.clip(plat, ci * cell_deg, (ci + 1) * cell_deg)
+    clon = np.clip(plon, cj * cell_deg, (cj + 1) * cell_deg)
+    keep = haversine_np(plat, plon, clat, clon) <= r * 1.001 + 1.0
+    return idx[keep], ci[keep], cj[keep]
+
+# ------------------- Index grid koordinat sekolah -------------------
+class SchoolIndex:
+    """
+    Index spasial grid lat/lon di atas koordinat sekolah.
+    Titik diurutkan per sel grid sehingga setiap sel = satu slice array;
+    query hanya menghitung haversine untuk sel di sekitar titik.
+    Hasil query berupa posisi baris (0..n-1) sesuai urutan input.
+    """
+
+    def __init__(self, lats, lons, cell_deg=0.02, source=None):
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        valid = np.isfinite(lats) & np.isfinite(lons)
+        self.n = len(lats)
+        self.cell_deg = cell_deg
+        self.source = source  # objek asal (mis. DataFrame) untuk deteksi perubahan
+
+        rows = np.flatnonzero(valid)
+        ci = np.floor(lats[rows] / cell_deg).astype(np.int64)
+        cj = np.floor(lons[rows] / cell_deg).astype(np.int64)
+        order = np.lexsort((cj, ci))
+        self.rows = rows[order]
+        self.lats = lats[self.rows]
+        self.lons = lons[self.rows]
+        ci, cj = ci[order], cj[order]
+
+        self.cells = {}
+        if len(self.rows):
+            change = np.flatnonzero((np.diff(ci) != 0) | (np.diff(cj) != 0)) + 1
+            starts = np.concatenate(([0], change))
+            ends = np.concatenate((change, [len(self.rows)]))
+            for s, e in zip(starts.tolist(), ends.tolist()):
+                self.cells[(int(ci[s]), int(cj[s]))] = (s, e)
+            self.ci_range = (int(ci.min()), int(ci.max()))
+            self.cj_range = (int(cj.min()), int(cj.max()))
+
+    @classmethod
+    def from_df(cls, df, lat_col="lat", lon_col="lon", **kwargs):
+        return cls(df[lat_col].to_numpy(), df[lon_col].to_numpy(), source=df, **kwargs)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def nbytes(self):
+        return self.rows.nbytes + self.lats.nbytes + self.lons.nbytes + 64 * len(self.cells)
+
+    # ---------- Helper ----------
+    def _cell_of(self, lat, lon):
+        return int(np.floor(lat / self.cell_deg)), int(np.floor(lon / self.cell_deg))
+
+    def _gather(self, i0, i1, j0, j1):
+        """Posisi internal (bukan row asli) semua titik di sel [i0..i1] x [j0..j1]."""
+        n_cells = (i1 - i0 + 1) * (j1 - j0 + 1)
+        if n_cells > len(self.cells):
+            # Area query lebih besar dari jumlah sel terisi: iterasi sel yang ada saja
+            parts = [np.arange(s, e) for (ci, cj), (s, e) in self.cells.items()
+                     if i0 <= ci <= i1 and j0 <= cj <= j1]
+        else:
+            parts = []
+            for ci in range(i0, i1 + 1):
+                for cj in range(j0, j1 + 1):
+                    span = self.cells.get((ci, cj))
+                    if span:
+                        parts.append(np.arange(span[0], span[1]))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def _lon_span_deg(self, lat, meters):
+        coslat = max(cos(radians(min(abs(lat) + meters / METERS_PER_DEG, 89.9))), 1e-6)
+        return meters / (METERS_PER_DEG * coslat)
+
+    # ---------- Query ----------
+    def within_radius(self, lat, lon, r):
+        """
+        Sekolah dalam radius r meter dari (lat, lon).
+        Kembalikan (rows, jarak) dengan rows terurut naik (urutan tabel asli).
+        """
+        if not len(self.rows):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        dlat = r / METERS_PER_DEG
+        dlon = self._lon_span_deg(lat, r)
+        i0, _ = self._cell_of(lat - dlat, lon)
+        i1, _ = self._cell_of(lat + dlat, lon)
+        _, j0 = self._cell_of(lat, lon - dlon)
+        _, j1 = self._cell_of(lat, lon + dlon)
+        cand = self._gather(i0, i1, j0, j1)
+        dist = haversine_np(lat, lon, self.lats[cand], self.lons[cand])
+        keep = dist <= r
+        rows, dist = self.rows[cand[keep]], dist[keep]
+        order = np.argsort(rows, kind="stable")
+        return rows[order], dist[order]
+
+    def within_bounds(self, south, west, north, east):
+        """Sekolah di dalam kotak lat/lon (viewport peta); rows terurut naik."""
+        if not len(self.rows):
+            return np.empty(0, dtype=np.int64)
+        # Viewport sangat lebar tidak perlu mengiterasi sel kosong di luar data
+        i0, j0 = self._cell_of(south, west)
+        i1, j1 = self._cell_of(north, east)
+        i0, i1 = max(i0, self.ci_range[0]), min(i1, self.ci_range[1])
+        j0, j1 = max(j0, self.cj_range[0]), min(j1, self.cj_range[1])
+        if i0 > i1 or j0 > j1:
+            return np.empty(0, dtype=np.int64)
+        cand = self._gather(i0, i1, j0, j1)
+        lats, lons = self.lats[cand], self.lons[cand]
+        keep = (lats >= south) & (lats <= north) & (lons >= west) & (lons <= east)
+        return np.sort(self.rows[cand[keep]])
+
+    def nearest(self, lat, lon, k=1):
+        """
+        k sekolah terdekat dari (lat, lon), diurutkan dari yang paling dekat.
+        Cincin sel diperluas sampai jarak ke-k pasti lebih kecil dari area yang sudah dicek.
+        """
+        k = min(k, len(self.rows))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        ci, cj = self._cell_of(lat, lon)
+        max_ring = max(
+            abs(ci - self.ci_range[0]), abs(ci - self.ci_range[1]),
+            abs(cj - self.cj_range[0]), abs(cj - self.cj_range[1]),
+        )
+        ring = 1
+        while True:
+            if ring >= max_ring:
+                cand = np.arange(len(self.rows))
+            else:
+                cand = self._gather(ci - ring, ci + ring, cj - ring, cj + ring)
+            if len(cand) >= k:
+                dist = haversine_np(lat, lon, self.lats[cand], self.lons[cand])
+                part = np.argpartition(dist, k - 1)[:k] if k < len(cand) else np.arange(len(cand))
+                part = part[np.lexsort((self.rows[cand[part]], dist[part]))]
+                if ring >= max_ring:
+                    return self.rows[cand[part]], dist[part]
+                # Jarak minimum ke titik di luar cincin yang sudah dicek
+                covered_deg = ring * self.cell_deg
+                covered_m = covered_deg * METERS_PER_DEG * cos(radians(min(abs(lat) + covered_deg, 89.9)))
+                if dist[part[-1]] <= covered_m:
+                    return self.rows[cand[part]], dist[part]
+            ring *= 2
@@ -0,0 +1,93 @@
+"""
+Paritas sentiment.py terhadap implementasi regex per frasa sebelum matcher satu-scan:
+clean_text, detect_sentiment dan correct_negative_sentence untuk sampel korpus sintetis
+(benchmarks.corpus, seed tetap) harus sama dengan keluaran yang direkam di
+tests/data/sentiment_parity.jsonl.gz.
+
+    python -m pytest tests
+    python -m tests.test_sentiment_parity --baseline sentiment_lama.py   # rekam ulang
+
+Jika leksikon sengaja diubah, rekam ulang dengan sentiment.py saat ini (tanpa --baseline)
+setelah memastikan perubahan skornya memang diharapkan.
+"""
+import argparse
+import gzip
+import importlib.util
+import json
+import math
+import sys
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import sentiment  # noqa: E402
+
+FIXTURE = Path(__file__).resolve().parent / "data" / "sentiment_parity.jsonl.gz"
+SAMPLE_SIZE = 2000
+SAMPLE_SEED = 7
+# Teks tepi di luar korpus: kosong, spasi, hanya tanda baca/emoji, angka, huruf besar
+EXTRA_TEXTS = ["", "   ", "!!!", "👍👍", "12345", "TIDAK BAGUS SAMA SEKALI", "gak   jelek  kok",
+               "tidak tidak bagus", "kurang ramah tapi bersih banget"]
+
+
+def _outputs(module, text):
+    pos, vader = module.detect_sentiment(text)
+    return {"text": text, "clean": module.clean_text(text), "pos_pct": pos, "vader_compound": vader,
+            "corrected": list(module.correct_negative_sentence(text))}
+
+
+def sample_texts(n=SAMPLE_SIZE, seed=SAMPLE_SEED):
+    from benchmarks.corpus import generate_reviews
+    return generate_reviews(n, seed) + EXTRA_TEXTS
+
+
+def record(module, path=FIXTURE, texts=None):
+    """Tulis keluaran module (sentiment.py lama/baru) untuk setiap teks sampel ke path."""
+    texts = sample_texts() if texts is None else texts
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        header = {"lexicon_version": getattr(module, "LEXICON_VERSION", None), "seed": SAMPLE_SEED, "n": len(texts)}
+        f.write(json.dumps(header) + "\n")
+        for text in texts:
+            f.write(json.dumps(_outputs(module, text), ensure_ascii=False) + "\n")
+    return len(texts)
+
+
+def _load_fixture():
+    with gzip.open(FIXTURE, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        return header, [json.loads(line) for line in f]
+
+
+def test_parity_with_recorded_outputs():
+    header, cases = _load_fixture()
+    assert len(cases) == header["n"]
+    mismatches = []
+    for case in cases:
+        got = _outputs(sentiment, case["text"])
+        same = (got["clean"] == case["clean"] and got["corrected"] == case["corrected"]
+                and math.isclose(got["pos_pct"], case["pos_pct"], rel_tol=0, abs_tol=1e-9)
+                and math.isclose(got["vader_compound"], case["vader_compound"], rel_tol=0, abs_tol=1e-9))
+        if not same:
+            mismatches.append((case, got))
+    assert not mismatches, (
+        f"{len(mismatches)}/{len(cases)} teks berbeda dari rekaman; contoh pertama:\n"
+        f"  direkam: {mismatches[0][0]}\n  sekarang: {mismatches[0][1]}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=None, help="Path sentiment.py lama sebagai sumber rekaman")
+    args = parser.parse_args(argv)
+    module = sentiment
+    if args.baseline:
+        spec = importlib.util.spec_from_file_location("sentiment_baseline", args.baseline)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    print(f"{record(module)} teks direkam ke {FIXTURE}")
+
+
+if __name__ == "__main__":
+    main()
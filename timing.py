@@ -0,0 +1,216 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from functools import wraps
+from logging.handlers import RotatingFileHandler
+
+# Log JSONL per rerun: aktif jika RADAR_ZONASI_TRACE_LOG berisi path file
+TRACE_LOG = os.environ.get("RADAR_ZONASI_TRACE_LOG") or None
+TRACE_SAMPLE = float(os.environ.get("RADAR_ZONASI_TRACE_SAMPLE", "1"))  # fraksi rerun yang dicatat ke log
+TRACE_LOG_MAX_BYTES = int(float(os.environ.get("RADAR_ZONASI_TRACE_LOG_MB", "10")) * 1024 * 1024)
+TRACE_LOG_BACKUPS = int(os.environ.get("RADAR_ZONASI_TRACE_LOG_BACKUPS", "5"))
+
+_local = threading.local()  # Trace aktif per thread (Streamlit: satu thread script per rerun)
+
+# ------------------- Span & trace -------------------
+class Span:
+    """Satu tahap dalam trace: nama, kedalaman, waktu mulai/durasi (ms) dan atribut (mis. rows)."""
+
+    __slots__ = ("trace", "name", "depth", "start_ms", "ms", "attrs", "_t0")
+
+    def __init__(self, trace, name, attrs):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+        self.ms = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        trace = self.trace
+        self.depth = trace._depth
+        trace._depth += 1
+        trace.spans.append(self)
+        self._t0 = time.perf_counter()
+        self.start_ms = (self._t0 - trace._t0) * 1000
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.ms = (time.perf_counter() - self._t0) * 1000
+        self.trace._depth -= 1
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        return False
+
+    def as_dict(self):
+        d = {"name": self.name, "depth": self.depth, "start_ms": round(self.start_ms, 3),
+             "ms": None if self.ms is None else round(self.ms, 3)}
+        d.update(self.attrs)
+        return d
+
+class _NoopSpan:
+    """Dipakai saat tidak ada trace aktif: tanpa alokasi, tanpa pengukuran."""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP = _NoopSpan()
+
+class Trace:
+    """Kumpulan span satu rerun + total waktu tunggu lock (db_lock, pool koneksi baca)."""
+
+    def __init__(self, name, **meta):
+        self.name = name
+        self.meta = meta
+        self.spans = []
+        self.waits = {}  # jenis lock -> [jumlah acquire, total detik menunggu]
+        self.timestamp = time.time()
+        self.total_ms = None
+        self._depth = 0
+        self._t0 = time.perf_counter()
+
+    def add_wait(self, kind, seconds):
+        entry = self.waits.setdefault(kind, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def finish(self):
+        if self.total_ms is None:
+            self.total_ms = (time.perf_counter() - self._t0) * 1000
+        return self
+
+    def as_dict(self):
+        return {
+            "trace": self.name,
+            "ts": round(self.timestamp, 3),
+            "total_ms": None if self.total_ms is None else round(self.total_ms, 3),
+            **self.meta,
+            "lock_wait": {k: {"count": n, "ms": round(s * 1000, 3)} for k, (n, s) in self.waits.items()},
+            "spans": [s.as_dict() for s in self.spans],
+        }
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+def start_trace(name, force=False, **meta):
+    """
+    Mulai trace baru untuk thread ini. Tanpa force, trace hanya dibuat jika log aktif
+    (RADAR_ZONASI_TRACE_LOG) dan rerun ini terpilih sampel; selain itu None dan semua span no-op.
+    """
+    if not force and not (TRACE_LOG and random.random() < TRACE_SAMPLE):
+        _local.trace = None
+        return None
+    trace = Trace(name, **meta)
+    _local.trace = trace
+    return trace
+
+def end_trace():
+    """Selesaikan trace aktif, tulis ke log (jika aktif) dan kembalikan trace-nya (atau None)."""
+    trace = getattr(_local, "trace", None)
+    _local.trace = None
+    if trace is None:
+        return None
+    trace.finish()
+    if TRACE_LOG:
+        _write_log(trace)
+    return trace
+
+def span(name, **attrs):
+    """Context manager pengukur satu tahap; no-op jika tidak ada trace aktif."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return _NOOP
+    return Span(trace, name, attrs)
+
+def _row_count(result):
+    # (df, cursor) seperti load_feedback_page → hitung baris df-nya
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    if isinstance(result, list) or hasattr(result, "columns"):
+        return len(result)
+    return None
+
+def traced(name=None, rows=True):
+    """
+    Dekorator: bungkus fungsi dalam span. rows=True → jumlah baris hasil
+    (len() DataFrame/list) dicatat sebagai atribut rows.
+    """
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = getattr(_local, "trace", None)
+            if trace is None:
+                return fn(*args, **kwargs)
+            with Span(trace, label, {}) as s:
+                result = fn(*args, **kwargs)
+                if rows:
+                    count = _row_count(result)
+                    if count is not None:
+                        s.set(rows=count)
+                return result
+        return wrapper
+    return decorate
+
+# ------------------- Lock dengan pencatatan waktu tunggu -------------------
+class TracedLock:
+    """
+    Pembungkus Lock/Semaphore: jika ada trace aktif, lama menunggu acquire
+    dicatat ke trace.waits[kind]. Tanpa trace, langsung meneruskan ke lock asli.
+    """
+
+    def __init__(self, kind, lock=None):
+        self.kind = kind
+        self._lock = lock if lock is not None else threading.Lock()
+
+    def acquire(self, *args, **kwargs):
+        trace = getattr(_local, "trace", None)
+        if trace is None:
+            return self._lock.acquire(*args, **kwargs)
+        t0 = time.perf_counter()
+        ok = self._lock.acquire(*args, **kwargs)
+        trace.add_wait(self.kind, time.perf_counter() - t0)
+        return ok
+
+    def release(self):
+        self._lock.release()
+
+    def locked(self):
+        return self._lock.locked()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self._lock.release()
+        return False
+
+# ------------------- Log JSONL berputar -------------------
+_logger = None
+_logger_lock = threading.Lock()
+
+def _write_log(trace):
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            _logger = logging.getLogger("radar_zonasi.timing")
+            _logger.setLevel(logging.INFO)
+            _logger.propagate = False  # Jangan ikut ke log Streamlit
+            handler = RotatingFileHandler(TRACE_LOG, maxBytes=TRACE_LOG_MAX_BYTES,
+                                          backupCount=TRACE_LOG_BACKUPS, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _logger.addHandler(handler)
+    _logger.info(json.dumps(trace.as_dict(), ensure_ascii=False, default=str))
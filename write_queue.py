@@ -0,0 +1,192 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from db import save_feedback, save_feedback_many
+
+logger = logging.getLogger(__name__)
+
+# Aktifkan dengan RADAR_ZONASI_ASYNC_WRITES=1; default tetap tulis sinkron
+ASYNC_WRITES = os.environ.get("RADAR_ZONASI_ASYNC_WRITES", "0").lower() in ("1", "true", "yes")
+
+# ------------------- Penulis feedback asinkron (group commit) -------------------
+class FeedbackWriter:
+    """
+    Antrian terbatas + satu thread latar yang menggabungkan insert feedback
+    ke dalam satu transaksi (group commit). Batch ditutup jika sudah berisi
+    batch_size baris atau max_delay detik sejak baris pertama diambil.
+    Jika antrian penuh, submit() menunggu (backpressure) hingga put_timeout,
+    lalu menulis langsung secara sinkron agar ulasan tidak hilang.
+    """
+
+    def __init__(self, maxsize=1000, batch_size=100, max_delay=0.05, put_timeout=2.0, max_retries=3):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)  # enqueue → commit (detik)
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.sync_fallbacks = 0
+        self.failed = 0
+        self.max_depth = 0
+        self._closed = False
+        self._submitting = 0  # submit() yang sedang memasukkan baris ke antrian
+        self._idle = threading.Condition(self._lock)
+        self._thread = threading.Thread(target=self._run, name="feedback-writer", daemon=True)
+        self._thread.start()
+
+    # ---------- API ----------
+    def submit(self, sekolah_id, opini, pos_pct, vader_compound, lexicon_version=None, minhash=None):
+        row = (sekolah_id, opini, pos_pct, vader_compound, lexicon_version, minhash)
+        # Cek _closed dan daftarkan submit di bawah lock yang sama dengan close(): close() menunggu
+        # semua put yang sedang berjalan sebelum mengirim sentinel, jadi tidak ada baris masuk
+        # ke antrian setelah pengurasan terakhir thread penulis
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._submitting += 1
+        if closed:
+            save_feedback(*row)
+            return
+        try:
+            try:
+                self.queue.put((time.perf_counter(), row), timeout=self.put_timeout)
+            except queue.Full:
+                with self._lock:
+                    self.sync_fallbacks += 1
+                save_feedback(*row)
+                return
+            with self._lock:
+                self.enqueued += 1
+                self.max_depth = max(self.max_depth, self.queue.qsize())
+        finally:
+            with self._lock:
+                self._submitting -= 1
+                if not self._submitting:
+                    self._idle.notify_all()
+
+    def flush(self):
+        """Tunggu sampai semua baris yang sudah diantrikan ter-commit."""
+        self.queue.join()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            while self._submitting:  # submit() berikutnya menulis sinkron
+                self._idle.wait()
+        self.queue.put(None)  # Sentinel: thread menulis sisa antrian lalu berhenti
+        self._thread.join()
+        logger.info("Penulis feedback ditutup: %s", self.stats())
+
+    def stats(self):
+        with self._lock:
+            lat = sorted(self._latencies)
+            return {
+                "depth": self.queue.qsize(),
+                "max_depth": self.max_depth,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "batches": self.batches,
+                "avg_batch": round(self.written / self.batches, 2) if self.batches else 0.0,
+                "sync_fallbacks": self.sync_fallbacks,
+                "failed": self.failed,
+                "latency_p50_ms": round(lat[len(lat) // 2] * 1000, 3) if lat else None,
+                "latency_p99_ms": round(lat[min(len(lat) - 1, int(len(lat) * 0.99))] * 1000, 3) if lat else None,
+            }
+
+    # ---------- Thread penulis ----------
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self.queue.get()
+            batch = []
+            if item is None:
+                stop = True
+            else:
+                batch.append(item)
+                deadline = time.perf_counter() + self.max_delay
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self.queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stop = True
+                        break
+                    batch.append(item)
+            if stop:
+                # Saat berhenti: ambil semua sisa antrian tanpa menunggu
+                while True:
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not None:
+                        batch.append(item)
+                    else:
+                        self.queue.task_done()
+            if batch:
+                self._write(batch)
+            for _ in range(len(batch) + (1 if stop else 0)):
+                self.queue.task_done()
+
+    def _write(self, batch):
+        rows = [row for _, row in batch]
+        failed = 0
+        for attempt in range(self.max_retries):
+            try:
+                save_feedback_many(rows)
+                break
+            except Exception:
+                logger.exception("Group commit gagal (percobaan %d dari %d)", attempt + 1, self.max_retries)
+                time.sleep(0.1 * (attempt + 1))
+        else:
+            # Batch tetap gagal: coba per baris agar satu baris rusak tidak menggagalkan semuanya
+            for row in rows:
+                try:
+                    save_feedback(*row)
+                except Exception:
+                    logger.exception("Feedback gagal disimpan: %r", row)
+                    failed += 1
+        now = time.perf_counter()
+        with self._lock:
+            self.failed += failed
+            self.written += len(rows) - failed
+            self.batches += 1
+            self._latencies.extend(now - enqueued_at for enqueued_at, _ in batch)
+
+# ------------------- Writer default per proses -------------------
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_feedback_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = FeedbackWriter()
+            atexit.register(_writer.close)  # Flush saat proses berhenti
+        return _writer
+
+def feedback_writer_stats():
+    """stats() writer default, atau None jika antrian tidak aktif / belum dipakai."""
+    with _writer_lock:
+        return None if _writer is None else _writer.stats()
+
+def submit_feedback(sekolah_id, opini, pos_pct, vader_compound, lexicon_version=None, minhash=None):
+    """Simpan feedback: lewat antrian group commit jika ASYNC_WRITES aktif, selain itu langsung."""
+    if ASYNC_WRITES:
+        get_feedback_writer().submit(sekolah_id, opini, pos_pct, vader_compound, lexicon_version, minhash)
+    else:
+        save_feedback(sekolah_id, opini, pos_pct, vader_compound, lexicon_version, minhash)
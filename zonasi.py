@@ -0,0 +1,47 @@
+import numpy as np
+from db import ZONASI_TIERS, load_zonasi_candidates, load_zonasi_coverage
+from spatial import cell_of, haversine_np, zonasi_cell_deg
+
+# ------------------- Query titik dalam zonasi -------------------
+def tier_for(r):
+    """Tier terkecil yang mencakup radius r meter."""
+    for tier in ZONASI_TIERS:
+        if r <= tier:
+            return tier
+    raise ValueError(f"Radius {r} m melebihi tier zonasi terbesar ({ZONASI_TIERS[-1]} m)")
+
+def schools_within(lat, lon, r):
+    """
+    Sekolah yang berjarak <= r meter dari (lat, lon), dari yang terdekat.
+    Satu lookup sel di zonasi_grid, lalu jarak persis hanya untuk kandidat di sel itu.
+    Kembalikan list (id, nama, jarak_meter).
+    """
+    tier = tier_for(r)
+    ci, cj = cell_of(lat, lon, zonasi_cell_deg(tier))
+    rows = load_zonasi_candidates(tier, ci, cj)
+    if not rows:
+        return []
+    dist = haversine_np(lat, lon, np.array([x[2] for x in rows]), np.array([x[3] for x in rows]))
+    hits = [(rows[i][0], rows[i][1], float(dist[i])) for i in np.flatnonzero(dist <= r)]
+    hits.sort(key=lambda h: (h[2], h[0]))
+    return hits
+
+# ------------------- Heatmap cakupan -------------------
+def coverage_points(tier, bounds, max_points=4000):
+    """
+    Titik heatmap [lat, lon, jumlah] untuk viewport bounds (south, west, north, east):
+    rata-rata jumlah sekolah yang radius tier-nya menjangkau tiap sel. Sel digabung
+    per blok k x k (k pangkat dua) agar jumlah titik tidak lebih dari ±max_points.
+    """
+    cell = zonasi_cell_deg(tier)
+    south, west, north, east = bounds
+    ci0, cj0 = cell_of(south, west, cell)
+    ci1, cj1 = cell_of(north, east, cell)
+    n_cells = (ci1 - ci0 + 1) * (cj1 - cj0 + 1)
+    k = 1
+    while n_cells / (k * k) > max_points:
+        k *= 2
+    return [
+        [(bi * k + k / 2) * cell, (bj * k + k / 2) * cell, n / (k * k)]
+        for bi, bj, n in load_zonasi_coverage(tier, ci0, ci1, cj0, cj1, k)
+    ]